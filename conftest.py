@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budgets(settings):
+    """Превышение бюджета запросов — ошибка, как в manage.py test."""
+    settings.QUERY_BUDGET_STRICT = True
@@ -0,0 +1,19 @@
+import pytest
+
+from core.middleware import QueryBudgetExceeded
+
+
+class TestQueryBudget:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_over_budget_view_fails(self, user_client, settings):
+        settings.QUERY_BUDGETS = {'posts:index': {'queries': 0}}
+        with pytest.raises(QueryBudgetExceeded):
+            user_client.get('/')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_within_budget_view_passes(self, user_client):
+        response = user_client.get('/')
+        assert response.status_code == 200, (
+            'Главная страница не уложилась в бюджет запросов'
+        )
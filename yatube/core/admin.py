@@ -0,0 +1,23 @@
+from django.contrib import admin
+from .models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'key', 'status', 'attempts', 'run_after')
+    list_filter = ('status',)
+    search_fields = ('key',)
+    # Запись в очереди — вызов функции воркером: из админки задачи
+    # только просматриваются и удаляются.
+    readonly_fields = (
+        'name', 'payload', 'key', 'status', 'attempts', 'run_after',
+        'locked_at', 'error', 'created'
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+admin.site.register(Job, JobAdmin)
@@ -0,0 +1,60 @@
+import os
+import sqlite3
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from .routers import PRIMARY, REPLICA_VERSION_KEY, replica_alias
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Выполняет PRAGMA из settings.SQLITE_PRAGMAS на новом соединении.
+
+    Подключается к сигналу connection_created. journal_mode хранится
+    в самом файле базы, поэтому меняется, только если отличается:
+    смена режима требует монопольного доступа к базе.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = dict(getattr(settings, 'SQLITE_PRAGMAS', {}))
+    raw = connection.connection
+    journal_mode = pragmas.pop('journal_mode', None)
+    if journal_mode is not None:
+        current = raw.execute('PRAGMA journal_mode').fetchone()[0]
+        if current.lower() != journal_mode.lower():
+            raw.execute(f'PRAGMA journal_mode = {journal_mode}')
+    for name, value in pragmas.items():
+        raw.execute(f'PRAGMA {name} = {value}')
+
+
+def refresh_replica():
+    """Копирует основную базу SQLite в файл реплики.
+
+    Копия делается backup API самого SQLite через соединение Django
+    с основной базой: источник читается одной транзакцией, запись
+    в него не останавливается, а читатели реплики видят либо старую,
+    либо новую копию целиком. Возвращает размер реплики в байтах.
+    """
+    alias = replica_alias()
+    if alias is None:
+        raise ValueError('Реплика не настроена: задайте READ_REPLICA.')
+    target = connections[alias].settings_dict['NAME']
+    # Соединение этого процесса с репликой откроется заново после копии.
+    connections[alias].close()
+    primary = connections[PRIMARY]
+    primary.ensure_connection()
+    copy_sqlite(primary.connection, target)
+    # Версия сбрасывается после копии: с новой версией читаются данные
+    # не старше этой копии.
+    cache.delete(REPLICA_VERSION_KEY)
+    return os.path.getsize(target)
+
+
+def copy_sqlite(source, target_path):
+    """Копирует базу соединения source в файл target_path."""
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
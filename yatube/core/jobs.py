@@ -0,0 +1,102 @@
+import json
+import logging
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS: int = 3
+RETRY_DELAY = timedelta(seconds=30)
+# Задача, взятая упавшим воркером, снова попадает в очередь.
+STALE_AFTER = timedelta(minutes=10)
+
+
+def enqueue(name, key='', **payload):
+    """Ставит вызов функции name(**payload) в очередь.
+
+    Задача с тем же непустым key, ещё не выполненная, не дублируется.
+    """
+    if key and Job.objects.filter(
+            key=key, status__in=(Job.PENDING, Job.RUNNING)).exists():
+        return None
+    return Job.objects.create(
+        name=name, key=key, payload=json.dumps(payload)
+    )
+
+
+def claim():
+    """Забирает ближайшую готовую задачу или возвращает None.
+
+    Задача переводится в RUNNING условным UPDATE, поэтому несколько
+    воркеров не выполнят одну задачу дважды и без SELECT FOR UPDATE.
+    """
+    now = timezone.now()
+    ready = Job.objects.filter(
+        Q(status=Job.PENDING, run_after__lte=now)
+        | Q(status=Job.RUNNING, locked_at__lt=now - STALE_AFTER)
+    )
+    for job in ready.order_by('run_after', 'pk')[:10]:
+        claimed = Job.objects.filter(
+            pk=job.pk, status=job.status, locked_at=job.locked_at
+        ).update(
+            status=Job.RUNNING, locked_at=now, attempts=F('attempts') + 1
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def run(job):
+    """Выполняет задачу; функции не из JOB_FUNCTIONS не вызываются.
+
+    Имя функции берётся из таблицы, поэтому без списка разрешённых
+    любая запись в ней стала бы вызовом произвольного кода.
+    """
+    if job.name not in settings.JOB_FUNCTIONS:
+        logger.error('Задача %s не из JOB_FUNCTIONS', job)
+        fail(job, f'{job.name} нет в JOB_FUNCTIONS', retry=False)
+        return False
+    try:
+        import_string(job.name)(**json.loads(job.payload))
+    except Exception:
+        logger.exception('Задача %s упала', job)
+        fail(job, traceback.format_exc(), job.attempts < MAX_ATTEMPTS)
+        return False
+    job.delete()
+    return True
+
+
+def fail(job, error, retry):
+    if retry:
+        job.status = Job.PENDING
+        job.run_after = timezone.now() + RETRY_DELAY * job.attempts
+    else:
+        job.status = Job.FAILED
+    job.error = error
+    job.locked_at = None
+    job.save(update_fields=['status', 'run_after', 'error', 'locked_at'])
+
+
+def work(once=False, sleep=1.0):
+    """Выполняет задачи по очереди; с once — пока очередь не опустеет.
+
+    Возвращает число выполненных задач.
+    """
+    done = 0
+    while True:
+        job = claim()
+        if job is None:
+            if once:
+                return done
+            time.sleep(sleep)
+            continue
+        done += run(job)
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.db import refresh_replica
+
+
+class Command(BaseCommand):
+    help = 'Обновляет реплику для чтения копией основной базы SQLite'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Повторять каждые столько секунд; 0 — один раз'
+        )
+
+    def handle(self, *args, interval, **options):
+        while True:
+            try:
+                size = refresh_replica()
+            except ValueError as error:
+                raise CommandError(error)
+            self.stdout.write(self.style.SUCCESS(
+                f'Реплика обновлена: {size} байт'
+            ))
+            if not interval:
+                return
+            time.sleep(interval)
@@ -0,0 +1,32 @@
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from core import jobs
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди в базе'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выйти, когда очередь опустеет'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=1.0,
+            help='Пауза в секундах, когда задач нет'
+        )
+
+    def handle(self, *args, once, sleep, **options):
+        if isinstance(caches['default'], LocMemCache):
+            self.stderr.write(self.style.WARNING(
+                'Кэш LocMemCache виден только этому процессу: веб-сервер '
+                'не узнает о сброшенных страницах и готовых миниатюрах. '
+                'Задайте общий кэш, например YATUBE_CACHE_DIR.'
+            ))
+        done = jobs.work(once=once, sleep=sleep)
+        self.stdout.write(self.style.SUCCESS(f'Выполнено задач: {done}'))
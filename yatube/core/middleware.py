@@ -0,0 +1,190 @@
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+from .routers import (
+    current_routing, replica_alias, start_routing, stop_routing
+)
+
+logger = logging.getLogger(__name__)
+
+SLOWEST_SQL_LENGTH: int = 200
+PRIMARY_COOKIE = 'primary_until'
+SAFE_METHODS = ('GET', 'HEAD')
+
+_current_stats = ContextVar('request_stats', default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestStats:
+    """Статистика одного запроса: SQL и время рендеринга шаблонов."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_sql = ''
+        self.template_time = 0.0
+        self._template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.queries += 1
+            self.sql_time += duration
+            if duration >= self.slowest_time:
+                self.slowest_time = duration
+                self.slowest_sql = sql
+
+    def as_dict(self):
+        return {
+            'queries': self.queries,
+            'sql_ms': round(self.sql_time * 1000, 2),
+            'slowest_ms': round(self.slowest_time * 1000, 2),
+            'template_ms': round(self.template_time * 1000, 2),
+        }
+
+
+@contextmanager
+def timed_render():
+    """Засчитывает время рендеринга шаблона текущему запросу.
+
+    Вложенные шаблоны (render_to_string внутри тегов) уже входят
+    во время внешнего и отдельно не считаются.
+    """
+    stats = _current_stats.get()
+    if stats is None:
+        yield
+        return
+    stats._template_depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats._template_depth -= 1
+        if not stats._template_depth:
+            stats.template_time += time.perf_counter() - start
+
+
+def header_value(value):
+    return ' '.join(value.split())[:SLOWEST_SQL_LENGTH].encode(
+        'ascii', 'backslashreplace'
+    ).decode()
+
+
+class QueryStatsMiddleware:
+    """Считает запросы к базе и время SQL и шаблонов для каждой страницы.
+
+    Для приложений из QUERY_STATS_APPS сверяет итог с QUERY_BUDGETS
+    по имени URL, а сотрудникам отдаёт цифры в заголовках ответа.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+
+        match = request.resolver_match
+        if match is None or match.app_name not in settings.QUERY_STATS_APPS:
+            return response
+        logger.debug('%s %s', match.view_name, stats.as_dict())
+        self.check_budget(match.view_name, stats)
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_staff:
+            self.add_headers(response, stats)
+        return response
+
+    def check_budget(self, view_name, stats):
+        budget = settings.QUERY_BUDGETS.get(view_name)
+        if not budget:
+            return
+        actual = stats.as_dict()
+        exceeded = {
+            name: (actual[name], limit)
+            for name, limit in budget.items()
+            if actual[name] > limit
+        }
+        if not exceeded:
+            return
+        message = f'{view_name} превысил бюджет: ' + ', '.join(
+            f'{name} {value} > {limit}'
+            for name, (value, limit) in exceeded.items()
+        )
+        if settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+    def add_headers(self, response, stats):
+        actual = stats.as_dict()
+        response['X-Query-Count'] = actual['queries']
+        response['X-SQL-Time-Ms'] = actual['sql_ms']
+        response['X-Slowest-Query-Ms'] = actual['slowest_ms']
+        response['X-Slowest-Query'] = header_value(stats.slowest_sql)
+        response['X-Template-Time-Ms'] = actual['template_ms']
+        response['Server-Timing'] = (
+            f'sql;dur={actual["sql_ms"]}, '
+            f'template;dur={actual["template_ms"]}'
+        )
+
+
+def reads_from_primary(request):
+    """Пользователь недавно писал и ещё читает с основной базы."""
+    try:
+        until = float(request.COOKIES.get(PRIMARY_COOKIE, 0))
+    except ValueError:
+        return False
+    return until > time.time()
+
+
+class ReplicaRoutingMiddleware:
+    """Отправляет чтение страниц из REPLICA_VIEWS на реплику.
+
+    Запрос, который что-то записал, ставит cookie: ещё
+    REPLICA_STICKY_SECONDS страницы этого пользователя читаются
+    с основной базы, пока реплика не догонит его изменения.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = start_routing()
+        try:
+            response = self.get_response(request)
+            wrote = current_routing().wrote
+        finally:
+            stop_routing(token)
+        if wrote and replica_alias():
+            sticky = settings.REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                PRIMARY_COOKIE, str(time.time() + sticky), max_age=sticky,
+                httponly=True, samesite='Lax'
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        current_routing().replica = bool(
+            replica_alias()
+            and request.method in SAFE_METHODS
+            and request.resolver_match.view_name in settings.REPLICA_VIEWS
+            and not reads_from_primary(request)
+        )
@@ -0,0 +1,37 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:35
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='функция')),
+                ('payload', models.TextField(default='{}', verbose_name='аргументы')),
+                ('key', models.CharField(blank=True, db_index=True, max_length=200, verbose_name='ключ')),
+                ('status', models.CharField(choices=[('pending', 'в очереди'), ('running', 'выполняется'), ('failed', 'ошибка')], default='pending', max_length=10, verbose_name='статус')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='попыток')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='не раньше')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='взята в работу')),
+                ('error', models.TextField(blank=True, verbose_name='ошибка')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='дата создания')),
+            ],
+            options={
+                'ordering': ['run_after', 'pk'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'run_after'], name='job_queue_idx'),
+        ),
+    ]
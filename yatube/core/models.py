@@ -0,0 +1,68 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """Фоновая задача: путь к функции и её аргументы в JSON."""
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'в очереди'),
+        (RUNNING, 'выполняется'),
+        (FAILED, 'ошибка'),
+    )
+
+    name = models.CharField(
+        max_length=200,
+        verbose_name='функция'
+    )
+    payload = models.TextField(
+        default='{}',
+        verbose_name='аргументы'
+    )
+    key = models.CharField(
+        max_length=200,
+        blank=True,
+        db_index=True,
+        verbose_name='ключ'
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING,
+        verbose_name='статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='попыток'
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='не раньше'
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='взята в работу'
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name='ошибка'
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='дата создания'
+    )
+
+    def __str__(self):
+        return f'{self.name} [{self.status}]'
+
+    class Meta:
+        ordering = ['run_after', 'pk']
+        indexes = [
+            models.Index(
+                fields=['status', 'run_after'], name='job_queue_idx'
+            ),
+        ]
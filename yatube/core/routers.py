@@ -0,0 +1,83 @@
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY = 'default'
+# Версия копии на реплике: refresh_replica сбрасывает её после каждого
+# обновления, и кэши, заполненные с реплики, перестают совпадать.
+REPLICA_VERSION_KEY = 'replica_version'
+
+_current_routing = ContextVar('replica_routing', default=None)
+
+
+class Routing:
+    """Куда читать в рамках одного запроса.
+
+    replica включает middleware для страниц из REPLICA_VIEWS; wrote
+    ставит роутер при первой записи — после неё запрос читает только
+    с основной базы, чтобы видеть свои изменения.
+    """
+
+    def __init__(self):
+        self.replica = False
+        self.wrote = False
+
+
+def current_routing():
+    return _current_routing.get()
+
+
+def start_routing():
+    """Новое состояние для запроса; вернуть токен в stop_routing."""
+    return _current_routing.set(Routing())
+
+
+def stop_routing(token):
+    _current_routing.reset(token)
+
+
+def replica_alias():
+    """Алиас реплики или None, если реплика не настроена."""
+    return getattr(settings, 'READ_REPLICA', None)
+
+
+def reads_replica():
+    """Текущий запрос читает с реплики."""
+    routing = current_routing()
+    return bool(
+        routing is not None and routing.replica and not routing.wrote
+        and replica_alias()
+    )
+
+
+class ReadReplicaRouter:
+    """Чтение страниц-лент с реплики, всё остальное — с основной базы.
+
+    Вне запроса (команды, фоновые задачи) и для приложений не из
+    REPLICA_APPS роутер ничего не решает, и Django берёт default.
+    """
+
+    def db_for_read(self, model, **hints):
+        routing = current_routing()
+        if routing is None or not routing.replica:
+            return None
+        if model._meta.app_label not in settings.REPLICA_APPS:
+            return None
+        if routing.wrote:
+            return PRIMARY
+        return replica_alias()
+
+    def db_for_write(self, model, **hints):
+        routing = current_routing()
+        if (routing is not None
+                and model._meta.app_label in settings.REPLICA_APPS):
+            routing.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплика — копия основной базы, связи между ними допустимы.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема попадает на реплику вместе с копией файла.
+        return db == PRIMARY
@@ -0,0 +1,161 @@
+import gzip
+import logging
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import (
+    ManifestStaticFilesStorage, staticfiles_storage
+)
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.txt', '.map', '.html')
+# Файлы меньше этого не сжимаются: выигрыш меньше заголовков.
+MIN_COMPRESS_SIZE: int = 512
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=0, must-revalidate'
+HASH_IN_NAME = re.compile(r'\.[0-9a-f]{12}(?=\.[^./]+$)')
+
+
+def compressors():
+    """(Content-Encoding, расширение, функция) в порядке предпочтения."""
+    if brotli is not None:
+        yield 'br', '.br', brotli.compress
+    yield 'gzip', '.gz', lambda data: gzip.compress(data, 9, mtime=0)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хэш содержимого в именах файлов и сжатые копии рядом с ними.
+
+    collectstatic кладёт к каждому текстовому файлу file.css.gz и, если
+    установлен brotli, file.css.br — serve отдаёт их без сжатия
+    на лету. Ссылки на файлы, которых нет в manifest (collectstatic
+    не запускался или файла нет вовсе), остаются без хэша.
+    """
+
+    manifest_strict = False
+
+    def hashed_name(self, name, content=None, filename=None):
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        if brotli is None:
+            logger.warning(
+                'Пакет brotli не установлен: .br копии не создаются, '
+                'только .gz. Установите зависимости из requirements.txt.'
+            )
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if name.endswith(COMPRESSIBLE) and self.exists(name):
+                for compressed_name in self.compress(name):
+                    yield name, compressed_name, True
+
+    def compress(self, name):
+        """Пишет сжатые копии name, если они меньше оригинала."""
+        with self.open(name) as file:
+            data = file.read()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return
+        for _, extension, compress in compressors():
+            compressed = compress(data)
+            if len(compressed) < len(data):
+                with open(self.path(name + extension), 'wb') as file:
+                    file.write(compressed)
+                yield name + extension
+
+
+def accepted_encodings(header):
+    """Кодировки из Accept-Encoding с ненулевым q."""
+    accepted = set()
+    for part in header.split(','):
+        token, *params = [item.strip() for item in part.split(';')]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if token and quality > 0:
+            accepted.add(token.lower())
+    return accepted
+
+
+def is_hashed(path):
+    """path — имя с хэшем из manifest, а не исходное."""
+    original = HASH_IN_NAME.sub('', path)
+    return original != path and (
+        staticfiles_storage.hashed_files.get(original) == path
+    )
+
+
+@require_safe
+def serve(request, path):
+    """Отдаёт файл из STATIC_ROOT, по возможности уже сжатый.
+
+    Имена с хэшем кэшируются браузером навсегда (immutable): новое
+    содержимое получит новое имя. Остальные перепроверяются.
+    """
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    stat = os.stat(full_path)
+    variants = [
+        (encoding, full_path + extension)
+        for encoding, extension, _ in compressors()
+        if os.path.isfile(full_path + extension)
+    ]
+    if not was_modified_since(
+            request.META.get('HTTP_IF_MODIFIED_SINCE'),
+            stat.st_mtime, stat.st_size):
+        # 304 обновляет закэшированный ответ, поэтому заголовки кэширования
+        # в нём те же, что и в 200.
+        return cache_headers(HttpResponseNotModified(), path, variants)
+
+    content_type = mimetypes.guess_type(full_path)[0]
+    accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    encoding, served_path = next(
+        (
+            (encoding, variant) for encoding, variant in variants
+            if encoding in accepted
+        ),
+        (None, full_path)
+    )
+    response = FileResponse(
+        open(served_path, 'rb'),
+        content_type=content_type or 'application/octet-stream'
+    )
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    return cache_headers(response, path, variants)
+
+
+def cache_headers(response, path, variants):
+    if variants:
+        response['Vary'] = 'Accept-Encoding'
+    response['Cache-Control'] = IMMUTABLE if is_hashed(path) else REVALIDATE
+    return response
@@ -0,0 +1,22 @@
+from django.template.backends.django import (
+    DjangoTemplates as BaseDjangoTemplates, Template
+)
+
+from .middleware import timed_render
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        with timed_render():
+            return super().render(context, request)
+
+
+class DjangoTemplates(BaseDjangoTemplates):
+    """Стандартный бэкенд, засекающий время рендеринга для QueryStats."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
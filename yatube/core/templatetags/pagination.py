@@ -0,0 +1,41 @@
+from django import template
+from django.http import QueryDict
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def page_url(context, **params):
+    """Ссылка на другую страницу с сохранением прочих GET-параметров."""
+    request = context.get('request')
+    query = request.GET.copy() if request else QueryDict(mutable=True)
+    for name in ('page', 'cursor'):
+        query.pop(name, None)
+    for name, value in params.items():
+        query[name] = value
+    return f'?{query.urlencode()}'
+
+
+@register.simple_tag
+def elided_page_range(page_obj, on_each_side=3, on_ends=2):
+    """Номера страниц вокруг текущей и по краям, пропуски — None."""
+    number = page_obj.number
+    num_pages = page_obj.paginator.num_pages
+    if num_pages <= (on_each_side + on_ends) * 2:
+        return list(range(1, num_pages + 1))
+
+    pages = []
+    if number > on_each_side + on_ends + 2:
+        pages.extend(range(1, on_ends + 1))
+        pages.append(None)
+        pages.extend(range(number - on_each_side, number + 1))
+    else:
+        pages.extend(range(1, number + 1))
+
+    if number < num_pages - on_each_side - on_ends - 1:
+        pages.extend(range(number + 1, number + on_each_side + 1))
+        pages.append(None)
+        pages.extend(range(num_pages - on_ends + 1, num_pages + 1))
+    else:
+        pages.extend(range(number + 1, num_pages + 1))
+    return pages
@@ -0,0 +1,421 @@
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.contrib.sessions.models import Session
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.utils import timezone
+from django.test import (
+    Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+)
+from django.urls import reverse
+
+from posts.models import Post, User
+from . import jobs
+from .db import copy_sqlite, refresh_replica
+from .middleware import (
+    PRIMARY_COOKIE, QueryBudgetExceeded, reads_from_primary
+)
+from .models import Job
+from .routers import (
+    ReadReplicaRouter, current_routing, start_routing, stop_routing
+)
+from .staticfiles import (
+    CompressedManifestStaticFilesStorage, accepted_encodings
+)
+
+STATS_HEADERS = (
+    'X-Query-Count', 'X-SQL-Time-Ms', 'X-Slowest-Query-Ms',
+    'X-Slowest-Query', 'X-Template-Time-Ms', 'Server-Timing'
+)
+
+
+class QueryStatsMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='User')
+        cls.staff = User.objects.create_user(username='Staff', is_staff=True)
+        Post.objects.create(text='Пост', author=cls.user)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.url = reverse('posts:index')
+        self.user_client = Client()
+        self.user_client.force_login(self.user)
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def test_staff_gets_stats_headers(self):
+        response = self.staff_client.get(self.url)
+        for header in STATS_HEADERS:
+            with self.subTest(header=header):
+                self.assertTrue(
+                    response.has_header(header),
+                    f'Сотрудник не получил заголовок {header}'
+                )
+        self.assertGreater(int(response['X-Query-Count']), 0)
+        self.assertGreater(float(response['X-Template-Time-Ms']), 0)
+        self.assertIn('SELECT', response['X-Slowest-Query'])
+
+    def test_regular_user_gets_no_headers(self):
+        response = self.user_client.get(self.url)
+        for header in STATS_HEADERS:
+            with self.subTest(header=header):
+                self.assertFalse(response.has_header(header))
+
+    @override_settings(QUERY_BUDGETS={'posts:index': {'queries': 1}})
+    def test_budget_exceeded(self):
+        with self.settings(QUERY_BUDGET_STRICT=True):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.user_client.get(self.url)
+        with self.settings(QUERY_BUDGET_STRICT=False):
+            with self.assertLogs('core.middleware', 'WARNING') as logs:
+                self.user_client.get(self.url)
+        self.assertIn('posts:index', logs.output[0])
+
+
+@override_settings(JOB_FUNCTIONS=('builtins.print', 'builtins.int'))
+class JobQueueTests(TestCase):
+    def test_same_key_is_enqueued_once(self):
+        first = jobs.enqueue('builtins.print', key='print', end='')
+        self.assertIsNotNone(first)
+        self.assertIsNone(jobs.enqueue('builtins.print', key='print'))
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_successful_job_is_deleted(self):
+        jobs.enqueue('builtins.print', end='')
+        self.assertEqual(jobs.work(once=True), 1)
+        self.assertFalse(Job.objects.exists())
+
+    def test_failed_job_is_retried_then_marked_failed(self):
+        job = jobs.enqueue('builtins.int', unknown=1)
+        with self.assertLogs('core.jobs', 'ERROR'):
+            self.assertEqual(jobs.work(once=True), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertIn('TypeError', job.error)
+
+        Job.objects.filter(pk=job.pk).update(
+            attempts=jobs.MAX_ATTEMPTS - 1, run_after=timezone.now()
+        )
+        with self.assertLogs('core.jobs', 'ERROR'):
+            jobs.work(once=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIsNone(jobs.claim(), 'Упавшая задача снова взята')
+
+    def test_unlisted_function_is_not_called(self):
+        job = jobs.enqueue('os.system', command='true')
+        with self.assertLogs('core.jobs', 'ERROR'):
+            self.assertEqual(jobs.work(once=True), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn('JOB_FUNCTIONS', job.error)
+
+    def test_admin_is_read_only(self):
+        admin = User.objects.create_superuser(
+            username='Admin', email='admin@example.com', password='pass'
+        )
+        job = jobs.enqueue('builtins.print', end='')
+        self.client.force_login(admin)
+        self.assertEqual(
+            self.client.get(reverse('admin:core_job_add')).status_code, 403
+        )
+        response = self.client.post(
+            reverse('admin:core_job_change', args=[job.pk]),
+            {'name': 'os.system', 'payload': '{"command": "true"}'}
+        )
+        self.assertEqual(response.status_code, 403)
+        job.refresh_from_db()
+        self.assertEqual(job.name, 'builtins.print')
+
+    def test_stale_running_job_is_reclaimed(self):
+        job = jobs.enqueue('builtins.print', end='')
+        self.assertEqual(jobs.claim().pk, job.pk)
+        self.assertIsNone(jobs.claim(), 'Задачу взяли два воркера')
+        Job.objects.filter(pk=job.pk).update(
+            locked_at=timezone.now() - jobs.STALE_AFTER * 2
+        )
+        self.assertEqual(jobs.claim().pk, job.pk)
+
+
+TEMP_STATIC_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(STATIC_ROOT=TEMP_STATIC_ROOT)
+class StaticFilesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Предупреждение об отсутствии brotli проверяет отдельный тест.
+        with mock.patch('core.staticfiles.logger'):
+            call_command('collectstatic', interactive=False, verbosity=0)
+        cls.hashed = staticfiles_storage.stored_name('css/bootstrap.min.css')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_STATIC_ROOT, ignore_errors=True)
+
+    def get(self, name, **headers):
+        return self.client.get(settings.STATIC_URL + name, **headers)
+
+    def test_collectstatic_writes_hashed_and_compressed_copies(self):
+        self.assertNotEqual(self.hashed, 'css/bootstrap.min.css')
+        with staticfiles_storage.open(self.hashed) as file:
+            original = file.read()
+        with staticfiles_storage.open(self.hashed + '.gz') as file:
+            self.assertEqual(gzip.decompress(file.read()), original)
+
+    def test_templates_link_hashed_names(self):
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, settings.STATIC_URL + self.hashed)
+
+    def test_hashed_file_is_immutable_and_compressed(self):
+        response = self.get(self.hashed, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertIn('immutable', response['Cache-Control'])
+        with staticfiles_storage.open(self.hashed + '.gz') as file:
+            self.assertEqual(b''.join(response.streaming_content), file.read())
+
+    def test_not_modified_keeps_cache_headers(self):
+        response = self.get(self.hashed)
+        response = self.get(
+            self.hashed, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertIn('immutable', response['Cache-Control'])
+
+    def test_missing_brotli_is_reported(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        storage = CompressedManifestStaticFilesStorage(location=location)
+        with mock.patch('core.staticfiles.brotli', None):
+            with self.assertLogs('core.staticfiles', 'WARNING') as logs:
+                list(storage.post_process({}))
+        self.assertIn('brotli', logs.output[0])
+
+    def test_plain_file_without_accept_encoding(self):
+        response = self.get(self.hashed, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        response = self.get('css/bootstrap.min.css')
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+    def test_missing_and_outside_files(self):
+        self.assertEqual(self.get('css/missing.css').status_code, 404)
+        self.assertEqual(self.get('../manage.py').status_code, 404)
+
+    def test_accepted_encodings(self):
+        self.assertEqual(
+            accepted_encodings('br;q=1.0, gzip;q=0, *;q=0.1'), {'br', '*'}
+        )
+
+
+class SqlitePragmasTests(TestCase):
+    def test_pragmas_are_applied_to_new_connections(self):
+        expected = {
+            'synchronous': 1,
+            'busy_timeout': settings.SQLITE_PRAGMAS['busy_timeout'],
+            'cache_size': settings.SQLITE_PRAGMAS['cache_size'],
+            'temp_store': 2,
+        }
+        with connection.cursor() as cursor:
+            for name, value in expected.items():
+                cursor.execute(f'PRAGMA {name}')
+                self.assertEqual(cursor.fetchone()[0], value, name)
+
+
+@override_settings(READ_REPLICA='replica')
+class ReadReplicaRouterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='User')
+        cls.author = User.objects.create_user(username='Author')
+        cls.post = Post.objects.create(text='Пост', author=cls.author)
+
+    def setUp(self):
+        super().setUp()
+        self.router = ReadReplicaRouter()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def route(self, replica=True):
+        token = start_routing()
+        self.addCleanup(stop_routing, token)
+        current_routing().replica = replica
+
+    def test_feed_reads_go_to_replica(self):
+        self.route()
+        self.assertEqual(self.router.db_for_read(Post), 'replica')
+        self.assertEqual(self.router.db_for_read(User), 'replica')
+        self.assertIsNone(
+            self.router.db_for_read(Session),
+            'Сессии должны читаться с основной базы'
+        )
+
+    def test_reads_after_write_go_to_primary(self):
+        self.route()
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_no_replica_outside_feed_requests(self):
+        self.assertIsNone(self.router.db_for_read(Post))
+        self.route(replica=False)
+        self.assertIsNone(self.router.db_for_read(Post))
+        with self.settings(READ_REPLICA=None):
+            self.route()
+            self.assertIsNone(self.router.db_for_read(Post))
+
+    def test_migrations_only_on_primary(self):
+        self.assertTrue(self.router.allow_migrate('default', 'posts'))
+        self.assertFalse(self.router.allow_migrate('replica', 'posts'))
+
+    def test_write_makes_reads_sticky(self):
+        writes = (
+            ('posts:add_comment', {'post_id': self.post.pk},
+             {'text': 'Комментарий'}),
+            ('posts:profile_follow', {'username': 'Author'}, None),
+        )
+        for name, kwargs, data in writes:
+            with self.subTest(view=name):
+                self.client.cookies.pop(PRIMARY_COOKIE, None)
+                if data is None:
+                    response = self.client.get(reverse(name, kwargs=kwargs))
+                else:
+                    response = self.client.post(
+                        reverse(name, kwargs=kwargs), data
+                    )
+                cookie = response.cookies.get(PRIMARY_COOKIE)
+                self.assertIsNotNone(cookie, f'{name} не закрепил чтение')
+                self.assertEqual(
+                    cookie['max-age'], settings.REPLICA_STICKY_SECONDS
+                )
+
+    def test_reads_set_no_cookie(self):
+        response = self.client.get(reverse('posts:post_create'))
+        self.assertNotIn(PRIMARY_COOKIE, response.cookies)
+
+    def test_sticky_window_expires(self):
+        request = RequestFactory().get('/')
+        request.COOKIES[PRIMARY_COOKIE] = str(time.time() + 10)
+        self.assertTrue(reads_from_primary(request))
+        request.COOKIES[PRIMARY_COOKIE] = str(time.time() - 1)
+        self.assertFalse(reads_from_primary(request))
+        request.COOKIES[PRIMARY_COOKIE] = 'мусор'
+        self.assertFalse(reads_from_primary(request))
+
+
+class RefreshReplicaTests(TestCase):
+    def test_copy_sqlite(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        replica_path = os.path.join(directory, 'replica.sqlite3')
+        source = sqlite3.connect(':memory:')
+        self.addCleanup(source.close)
+        source.execute('CREATE TABLE post (text TEXT)')
+        source.execute("INSERT INTO post VALUES ('первый')")
+        source.commit()
+        copy_sqlite(source, replica_path)
+        source.execute("INSERT INTO post VALUES ('второй')")
+        source.commit()
+
+        replica = sqlite3.connect(replica_path)
+        self.addCleanup(replica.close)
+        self.assertEqual(
+            replica.execute('SELECT text FROM post').fetchall(),
+            [('первый',)]
+        )
+        copy_sqlite(source, replica_path)
+        self.assertEqual(
+            replica.execute('SELECT COUNT(*) FROM post').fetchone()[0], 2
+        )
+
+    def test_command_requires_replica(self):
+        with self.assertRaises(CommandError):
+            call_command('refresh_replica')
+
+
+@override_settings(READ_REPLICA='replica')
+class ReplicaEndToEndTests(TransactionTestCase):
+    """Настоящая вторая база: файл, который обновляет refresh_replica."""
+
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        connections.databases['replica'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(cls.directory, 'replica.sqlite3'),
+        }
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].close()
+        del connections.databases['replica']
+        if hasattr(connections._connections, 'replica'):
+            delattr(connections._connections, 'replica')
+        shutil.rmtree(cls.directory)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.author = User.objects.create_user(username='Author')
+        self.reader = Client()
+        self.reader.force_login(
+            User.objects.create_user(username='Reader')
+        )
+        self.writer = Client()
+        self.writer.force_login(self.author)
+        Post.objects.create(text='Старый пост', author=self.author)
+        refresh_replica()
+
+    def index(self, client):
+        return client.get(reverse('posts:index')).content.decode()
+
+    def test_replica_lag_and_read_your_writes(self):
+        self.assertIn('Старый пост', self.index(self.reader))
+        self.writer.post(reverse('posts:post_create'), {'text': 'Новый пост'})
+        self.assertTrue(Post.objects.filter(text='Новый пост').exists())
+
+        self.assertNotIn(
+            'Новый пост', self.index(self.reader),
+            'Читатель должен читать с реплики, которая ещё не обновлена'
+        )
+        self.assertIn(
+            'Новый пост', self.index(self.writer),
+            'Автор получил фрагмент, собранный с отстающей реплики'
+        )
+        refresh_replica()
+        self.assertIn(
+            'Новый пост', self.index(self.reader),
+            'Фрагмент с реплики пережил её обновление'
+        )
+
+    def test_anonymous_page_cache_follows_replica(self):
+        url = reverse('posts:profile', kwargs={'username': 'Author'})
+        self.assertIn('Старый пост', self.client.get(url).content.decode())
+        self.writer.post(reverse('posts:post_create'), {'text': 'Новый пост'})
+        self.assertNotIn(
+            'Новый пост', self.client.get(url).content.decode()
+        )
+        refresh_replica()
+        self.assertIn('Новый пост', self.client.get(url).content.decode())
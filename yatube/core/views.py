@@ -10,7 +10,8 @@ def page_not_found(request, exception):
     )
 
 
-def csrf_failure(request, reason=''):
+def csrf_failure(request, reason='', exception=None):
+    # Этот же обработчик стоит в handler403: туда Django передаёт exception.
     return render(request, 'core/403.html', status=403)
 
 
@@ -1,26 +1,139 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.urls import reverse
+from django.utils.functional import cached_property
 from .models import Post, Group, Comment, Follow
+from .search import build_query, is_available, matching_ids
 
 
-class PostAdmin(admin.ModelAdmin):
+class CappedCountPaginator(Paginator):
+    """Пагинатор списков админки без COUNT(*) по всей таблице.
+
+    Считается не больше COUNT_LIMIT строк. Если их больше, для таблицы
+    без фильтров число оценивается по максимальному id, а для выборки
+    с фильтрами ограничивается COUNT_LIMIT.
+    """
+
+    COUNT_LIMIT: int = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list.order_by()
+        count = queryset[:self.COUNT_LIMIT + 1].count()
+        if count <= self.COUNT_LIMIT:
+            return count
+        if queryset.query.where:
+            return self.COUNT_LIMIT
+        return queryset.model._default_manager.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first()
+
+
+class AutocompleteFilter(admin.FieldListFilter):
+    """Фильтр по внешнему ключу с поиском вместо списка всех значений.
+
+    Варианты подгружает autocomplete-view админки связанной модели,
+    поэтому у неё должны быть заданы search_fields.
+    """
+
+    template = 'admin/autocomplete_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin,
+                 field_path):
+        self.lookup_kwarg = f'{field_path}__{field.target_field.name}__exact'
+        self.lookup_val = params.get(self.lookup_kwarg)
+        super().__init__(
+            field, request, params, model, model_admin, field_path
+        )
+        self.admin_site = model_admin.admin_site
+
+    def expected_parameters(self):
+        return [self.lookup_kwarg]
+
+    def choices(self, changelist):
+        related = self.field.remote_field.model
+        selected = None
+        if self.lookup_val:
+            selected = related._default_manager.filter(
+                **{self.field.target_field.name: self.lookup_val}
+            ).first()
+        yield {
+            'parameter': self.lookup_kwarg,
+            'value': self.lookup_val or '',
+            'label': str(selected) if selected else '',
+            'url': reverse(
+                f'{self.admin_site.name}:{related._meta.app_label}_'
+                f'{related._meta.model_name}_autocomplete'
+            ),
+        }
+
+    @classmethod
+    def media(cls, field, admin_site):
+        return AutocompleteSelect(field.remote_field, admin_site).media + (
+            forms.Media(js=('js/autocomplete_filter.js',))
+        )
+
+
+class ScalableAdmin(admin.ModelAdmin):
+    """Список без полного COUNT(*) и с подключёнными автокомплитами."""
+
+    paginator = CappedCountPaginator
+    show_full_result_count = False
+
+    @property
+    def media(self):
+        media = super().media
+        for spec in self.list_filter:
+            if isinstance(spec, tuple) and spec[1] is AutocompleteFilter:
+                field = self.model._meta.get_field(spec[0])
+                media += AutocompleteFilter.media(field, self.admin_site)
+        return media
+
+
+class PostAdmin(ScalableAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
-    list_filter = ('pub_date',)
-    list_editable = ('group',)
+    list_filter = ('pub_date', ('author', AutocompleteFilter))
+    date_hierarchy = 'pub_date'
+    autocomplete_fields = ('author', 'group')
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск по полнотекстовому индексу вместо LIKE '%...%'.
+        if not is_available() or not build_query(search_term):
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return queryset.filter(pk__in=matching_ids(search_term)), False
+
+
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'title', 'slug')
+    search_fields = ('title', 'slug')
+
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(ScalableAdmin):
     list_display = ('pk', 'text', 'created', 'author', 'post')
+    list_select_related = ('author', 'post')
     search_fields = ('text',)
-    list_filter = ('created',)
+    list_filter = ('created', ('author', AutocompleteFilter))
+    date_hierarchy = 'created'
+    autocomplete_fields = ('author', 'post')
 
 
-class FollowAdmin(admin.ModelAdmin):
-    list_filter = ('user', )
+class FollowAdmin(ScalableAdmin):
+    list_display = ('pk', 'user', 'author')
+    list_select_related = ('user', 'author')
+    list_filter = (
+        ('user', AutocompleteFilter), ('author', AutocompleteFilter)
+    )
+    autocomplete_fields = ('user', 'author')
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
 admin.site.register(Comment, CommentAdmin)
 admin.site.register(Follow, FollowAdmin)
@@ -0,0 +1,297 @@
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from math import ceil
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import OperationalError, connection, connections
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.db import copy_sqlite
+from core.routers import PRIMARY
+from .models import Comment, Follow, Group, Post, User
+from .paginators import BACKWARD, encode_cursor
+from .search import WORDS
+
+PERCENTILES = (50, 95, 99)
+BENCHMARK_TEXT = 'benchmark_db'
+BENCHMARK_ALIAS = 'benchmark'
+# Умолчания SQLite — то, что было до SQLITE_PRAGMAS; busy_timeout
+# остаётся от sqlite3.connect (5 секунд).
+BASELINE_PRAGMAS = {
+    'journal_mode': 'DELETE',
+    'synchronous': 'FULL',
+    'mmap_size': 0,
+    'cache_size': -2000,
+    'temp_store': 'DEFAULT',
+}
+
+
+def percentile(values, rank):
+    """Перцентиль по ближайшему рангу."""
+    ordered = sorted(values)
+    return ordered[max(ceil(rank / 100 * len(ordered)) - 1, 0)]
+
+
+def sample_urls():
+    """По одному адресу на каждую страницу posts, на самых тяжёлых данных.
+
+    Берутся самый популярный автор, самая большая группа, пост с
+    наибольшим числом комментариев, самый активный читатель и для
+    поиска — первое слово новейшего поста (в синтетических данных
+    оно есть в каждом посте).
+    Возвращает (имя, url, пользователь) — пользователь None для гостя.
+    """
+    reader = User.objects.annotate(
+        following_total=Count('follower')
+    ).order_by('-following_total').first()
+    author = User.objects.annotate(
+        followers_total=Count('following')
+    ).order_by('-followers_total').first()
+    group = Group.objects.annotate(
+        posts_total=Count('posts')
+    ).order_by('-posts_total').first()
+    post = Post.objects.order_by('-comments_count').first()
+    own_post = Post.objects.filter(author=reader).first()
+    latest = Post.objects.order_by('-pk').first()
+    if None in (reader, author, group, post):
+        return []
+    term = (WORDS.findall(latest.text) or ['пост'])[0]
+
+    last_page = encode_cursor(BACKWARD)
+    urls = [
+        ('posts:index', reverse('posts:index'), None),
+        ('posts:index', reverse('posts:index'), reader),
+        ('posts:index[last]', f'{reverse("posts:index")}?cursor={last_page}',
+         reader),
+        ('posts:index[page]', f'{reverse("posts:index")}?page=1000', reader),
+        ('posts:group_list',
+         reverse('posts:group_list', kwargs={'slug': group.slug}), reader),
+        ('posts:profile',
+         reverse('posts:profile', kwargs={'username': author.username}),
+         reader),
+        ('posts:post_detail',
+         reverse('posts:post_detail', kwargs={'post_id': post.pk}), reader),
+        ('posts:post_comments',
+         reverse('posts:post_comments', kwargs={'post_id': post.pk}), reader),
+        ('posts:follow_index', reverse('posts:follow_index'), reader),
+        ('posts:search[heavy]',
+         f'{reverse("posts:search")}?{urlencode({"q": term})}', reader),
+        ('posts:post_create', reverse('posts:post_create'), reader),
+    ]
+    if own_post:
+        urls.append((
+            'posts:post_edit',
+            reverse('posts:post_edit', kwargs={'post_id': own_post.pk}),
+            reader
+        ))
+    if author != reader:
+        # Подписка и отписка идут парой, чтобы не менять данные.
+        following = Follow.objects.filter(user=reader, author=author).exists()
+        pair = ['posts:profile_follow', 'posts:profile_unfollow']
+        for name in (reversed(pair) if following else pair):
+            urls.append((
+                name, reverse(name, kwargs={'username': author.username}),
+                reader
+            ))
+    return urls
+
+
+def measure(client, url, cold):
+    if cold:
+        cache.clear()
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = client.get(url)
+            duration = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return response.status_code, duration, len(queries), peak
+
+
+def run(repeat=20, cold=False):
+    """Прогоняет страницы posts через тестовый клиент.
+
+    Для каждой страницы в views — перцентили времени в мс, число
+    запросов к базе и пиковая память в КиБ. Под tracemalloc время
+    выше реального, поэтому сравнивать стоит только прогоны между собой.
+    """
+    clients = {}
+    views = {}
+    for name, url, user in sample_urls():
+        if user not in clients:
+            clients[user] = Client()
+            if user is not None:
+                clients[user].force_login(user)
+        client = clients[user]
+        if user is None:
+            name = f'{name}[guest]'
+        samples = [measure(client, url, cold) for _ in range(repeat)]
+        timings = [duration * 1000 for _, duration, _, _ in samples]
+        query_counts = [count for _, _, count, _ in samples]
+        views[name] = {
+            'url': url,
+            'status': samples[-1][0],
+            **{
+                f'p{rank}_ms': round(percentile(timings, rank), 2)
+                for rank in PERCENTILES
+            },
+            'queries': max(query_counts),
+            'queries_min': min(query_counts),
+            'peak_memory_kb': round(
+                max(peak for _, _, _, peak in samples) / 1024, 1
+            ),
+        }
+    return {
+        'dataset': {
+            model._meta.model_name: model.objects.count()
+            for model in (User, Group, Post, Comment, Follow)
+        },
+        'repeat': repeat,
+        'cold': cold,
+        'views': views,
+    }
+
+
+@contextmanager
+def database_copy():
+    """Копия основной базы во временном файле под отдельным алиасом.
+
+    Нагрузка пишет только в копию: живая база и её кэши не меняются,
+    а после прогона копия удаляется целиком. Возвращает алиас.
+    """
+    directory = tempfile.mkdtemp()
+    primary = connections[PRIMARY]
+    primary.ensure_connection()
+    copy_sqlite(
+        primary.connection, os.path.join(directory, 'benchmark.sqlite3')
+    )
+    connections.databases[BENCHMARK_ALIAS] = {
+        **primary.settings_dict,
+        'NAME': os.path.join(directory, 'benchmark.sqlite3'),
+    }
+    try:
+        yield BENCHMARK_ALIAS
+    finally:
+        connections[BENCHMARK_ALIAS].close()
+        del connections.databases[BENCHMARK_ALIAS]
+        if hasattr(connections._connections, BENCHMARK_ALIAS):
+            delattr(connections._connections, BENCHMARK_ALIAS)
+        shutil.rmtree(directory)
+
+
+def stress_worker(alias, deadline, write_ratio, author_ids, stats, lock,
+                  seed):
+    """Поток нагрузки: читает первую страницу ленты или пишет пост."""
+    rng = random.Random(seed)
+    timings = {'read': [], 'write': []}
+    errors = 0
+    try:
+        while time.perf_counter() < deadline:
+            kind = 'write' if rng.random() < write_ratio else 'read'
+            start = time.perf_counter()
+            try:
+                if kind == 'write':
+                    now = timezone.now()
+                    # raw, как при loaddata: обработчики сигналов
+                    # пропускают такие сохранения и не трогают кэши.
+                    Post(
+                        text=BENCHMARK_TEXT,
+                        author_id=rng.choice(author_ids),
+                        pub_date=now,
+                        updated_at=now,
+                    ).save_base(using=alias, raw=True)
+                else:
+                    list(Post.objects.using(alias).feed()[:10])
+            except OperationalError:
+                errors += 1
+                continue
+            timings[kind].append((time.perf_counter() - start) * 1000)
+    finally:
+        connections[alias].close()
+    with lock:
+        for kind, values in timings.items():
+            stats[kind].extend(values)
+        stats['errors'] += errors
+
+
+def stress(threads, seconds, write_ratio, pragmas):
+    """Один прогон нагрузки с заданными PRAGMA на копии базы."""
+    author_ids = list(User.objects.values_list('pk', flat=True)[:1000])
+    if not author_ids:
+        return {}
+    stats = {'read': [], 'write': [], 'errors': 0}
+    lock = threading.Lock()
+    with override_settings(SQLITE_PRAGMAS=pragmas), database_copy() as alias:
+        # Режим журнала меняется, только пока других соединений с файлом
+        # нет; если он не сменился, сравнение прогонов бессмысленно.
+        with connections[alias].cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            journal_mode = cursor.fetchone()[0]
+        expected = pragmas.get('journal_mode', journal_mode)
+        if journal_mode.lower() != expected.lower():
+            raise RuntimeError(
+                f'journal_mode копии {journal_mode}, а не {expected}.'
+            )
+        deadline = time.perf_counter() + seconds
+        workers = [
+            threading.Thread(target=stress_worker, args=(
+                alias, deadline, write_ratio, author_ids, stats, lock, seed
+            ))
+            for seed in range(threads)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    report = {
+        'journal_mode': journal_mode.lower(),
+        'reads': len(stats['read']),
+        'writes': len(stats['write']),
+        'errors': stats['errors'],
+        'ops_per_sec': round(
+            (len(stats['read']) + len(stats['write'])) / seconds, 1
+        ),
+    }
+    for kind in ('read', 'write'):
+        for rank in PERCENTILES:
+            report[f'{kind}_p{rank}_ms'] = round(
+                percentile(stats[kind], rank), 2
+            ) if stats[kind] else None
+    return report
+
+
+def run_concurrency(threads=8, seconds=10.0, write_ratio=0.1):
+    """Сравнивает пропускную способность с умолчаниями SQLite
+    и с SQLITE_PRAGMAS из настроек.
+
+    Прогоны идут на временных копиях базы, живая база не меняется.
+    """
+    return {
+        'threads': threads,
+        'seconds': seconds,
+        'write_ratio': write_ratio,
+        'runs': {
+            'baseline': stress(
+                threads, seconds, write_ratio, BASELINE_PRAGMAS
+            ),
+            'tuned': stress(
+                threads, seconds, write_ratio, settings.SQLITE_PRAGMAS
+            ),
+        },
+    }
@@ -0,0 +1,72 @@
+from uuid import uuid4
+
+from django.core.cache import cache
+
+from core.routers import REPLICA_VERSION_KEY, reads_replica
+from . import feeds
+from .models import Follow
+
+FEED_VERSION_KEY = 'feed_version:{}'
+AUTHOR_VERSION_KEY = 'author_version:{}'
+POSTS_GENERATION_KEY = 'posts_generation'
+
+
+def get_versions(keys):
+    """Версии — случайные токены: сброшенный или вытесненный ключ
+    получает новое значение и не совпадёт ни с одним старым."""
+    versions = cache.get_many(keys)
+    missing = {key: uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def source_keys(keys):
+    """keys плюс версия копии реплики, если запрос читает с неё.
+
+    Реплика отстаёт от основной базы: фрагмент, собранный с неё после
+    сброса версии, не должен достаться читателям основной базы
+    и должен устареть со следующим обновлением реплики.
+    """
+    if reads_replica():
+        return list(keys) + [REPLICA_VERSION_KEY]
+    return list(keys)
+
+
+def bump_versions(keys):
+    cache.delete_many(keys)
+
+
+def feed_version(user_id, pulled):
+    """Версия ленты подписок: своя плюс версии подтягиваемых авторов."""
+    keys = [FEED_VERSION_KEY.format(user_id)] + [
+        AUTHOR_VERSION_KEY.format(author_id) for author_id in pulled
+    ]
+    return '.'.join(get_versions(source_keys(keys)))
+
+
+def bump_feed(user_id):
+    bump_versions([FEED_VERSION_KEY.format(user_id)])
+
+
+def bump_author_feeds(author_id):
+    """Сбрасывает ленты, в которые попадают посты автора."""
+    if feeds.is_pulled(author_id):
+        bump_versions([AUTHOR_VERSION_KEY.format(author_id)])
+        return
+    followers = Follow.objects.filter(
+        author_id=author_id
+    ).values_list('user_id', flat=True)
+    bump_versions([
+        FEED_VERSION_KEY.format(user_id) for user_id in followers.iterator()
+    ])
+
+
+def posts_generation():
+    """Общее поколение постов для фрагментов главной, групп и профилей."""
+    return '.'.join(get_versions(source_keys([POSTS_GENERATION_KEY])))
+
+
+def bump_posts_generation():
+    bump_versions([POSTS_GENERATION_KEY])
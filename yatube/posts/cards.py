@@ -0,0 +1,61 @@
+from hashlib import md5
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .thumbnails import prefetch_pictures
+
+CARD_TEMPLATE = 'includes/posts_list.html'
+CARD_KEY = 'card:{}:{}:{}'
+CARD_TIMEOUT: int = 7 * 24 * 60 * 60
+# Страницы, где карточка выглядит иначе: в профиле нет ссылки на
+# автора, в группе — на группу. Остальные получают полную карточку.
+CARD_VARIANTS = ('posts:profile', 'posts:group_list')
+
+
+def card_version(post):
+    """Всё, от чего зависит HTML карточки, кроме неизменных полей поста.
+
+    updated_at меняется при любом сохранении поста, в том числе когда
+    воркер доделал миниатюры; имя автора и ссылка на группу хранятся
+    в других таблицах и поэтому входят в версию явно.
+    """
+    author = post.author
+    group = post.group
+    parts = (
+        post.updated_at.isoformat(), author.username, author.first_name,
+        author.last_name, group.slug if group else ''
+    )
+    return md5('|'.join(parts).encode()).hexdigest()
+
+
+def card_key(post, variant):
+    return CARD_KEY.format(variant, post.pk, card_version(post))
+
+
+def render_cards(posts, view_name):
+    """HTML карточек постов по порядку: из кэша одним get_many,
+    рендерятся только промахи.
+
+    Картинки ищутся только для постов, карточек которых нет в кэше.
+    """
+    posts = list(posts)
+    variant = view_name if view_name in CARD_VARIANTS else ''
+    keys = [card_key(post, variant) for post in posts]
+    cards = cache.get_many(keys)
+    missing = [
+        (key, post) for key, post in zip(keys, posts) if key not in cards
+    ]
+    if missing:
+        prefetch_pictures(post for _, post in missing)
+        rendered = {
+            key: render_to_string(
+                CARD_TEMPLATE, {'post': post, 'view_name': view_name}
+            )
+            for key, post in missing
+        }
+        cache.set_many(rendered, CARD_TIMEOUT)
+        cards.update(rendered)
+    # Карточки — HTML, отрендеренный нашим же шаблоном.
+    return [mark_safe(cards[key]) for key in keys]
@@ -0,0 +1,87 @@
+from hashlib import md5
+
+from django.middleware.csrf import get_token
+
+from users.models import Profile
+from .caching import FEED_VERSION_KEY, get_versions, posts_generation
+from .models import Post
+
+
+def make_etag(*parts):
+    return md5('|'.join(map(str, parts)).encode()).hexdigest()
+
+
+def feed_etag(request, *args, **kwargs):
+    """Валидатор лент без обращения к базе.
+
+    max(pub_date, id) не замечает правок и удалений, поэтому ETag
+    строится из поколения постов: его сбрасывает любая запись поста,
+    группы или автора.
+    """
+    return make_etag(
+        request.get_full_path(), request.user.pk, posts_generation()
+    )
+
+
+def profile_etag(request, username):
+    counters = Profile.objects.filter(
+        user__username=username
+    ).values_list('posts_count', 'followers_count', 'following_count')
+    counters = counters.first()
+    if counters is None:
+        return None
+    # Версия ленты зрителя меняется при его подписке и отписке,
+    # от которых зависит кнопка на странице профиля.
+    viewer_version = (
+        get_versions([FEED_VERSION_KEY.format(request.user.pk)])[0]
+        if request.user.is_authenticated else None
+    )
+    return make_etag(
+        request.get_full_path(), request.user.pk, posts_generation(),
+        viewer_version, *counters
+    )
+
+
+def post_state(request, post_id):
+    """Одна строка со всем, что post_detail показывает о посте.
+
+    updated_at обновляется и при добавлении или удалении комментария.
+    """
+    if not hasattr(request, '_post_state'):
+        request._post_state = Post.objects.filter(pk=post_id).values_list(
+            'updated_at',
+            'author__profile__posts_count',
+            'author__username',
+            'author__first_name',
+            'author__last_name',
+            'group__title',
+            'group__slug'
+        ).first()
+    return request._post_state
+
+
+def post_etag(request, post_id):
+    state = post_state(request, post_id)
+    if state is None:
+        return None
+    return make_etag(request.get_full_path(), request.user.pk, *state)
+
+
+def post_detail_etag(request, post_id):
+    """ETag страницы поста.
+
+    Авторизованным страница приходит с формой комментария и токеном
+    CSRF: после нового входа токен другой, и 304 не должен отдать
+    форму со старым. Last-Modified у страницы нет — updated_at
+    не меняется при правке автора и его счётчиков, а ETag их учитывает.
+    """
+    etag = post_etag(request, post_id)
+    if etag is None or not request.user.is_authenticated:
+        return etag
+    get_token(request)
+    return make_etag(etag, request.META['CSRF_COOKIE'])
+
+
+def post_last_modified(request, post_id):
+    state = post_state(request, post_id)
+    return state[0] if state else None
@@ -0,0 +1,81 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from users.models import Profile
+from .models import Comment, Follow, Post
+
+BATCH_SIZE: int = 1000
+
+
+def bump(queryset, field, delta, **changes):
+    """Атомарно сдвигает счётчик на delta, не уходя ниже нуля."""
+    queryset.update(**{field: Greatest(F(field) + delta, 0)}, **changes)
+
+
+def bump_profile(user_id, field, delta):
+    bump(Profile.objects.filter(user_id=user_id), field, delta)
+
+
+def bump_comments(post_id, delta):
+    # Комментарии — часть состояния поста для условных GET-запросов,
+    # поэтому вместе со счётчиком обновляется и updated_at.
+    bump(
+        Post.objects.filter(pk=post_id), 'comments_count', delta,
+        updated_at=timezone.now()
+    )
+
+
+def related_count(model, field, outer='pk'):
+    rows = model.objects.filter(**{field: OuterRef(outer)}).order_by()
+    return Coalesce(
+        Subquery(
+            rows.values(field).annotate(total=Count('pk')).values('total'),
+            output_field=IntegerField()
+        ),
+        0
+    )
+
+
+def profile_counters():
+    return {
+        'posts_count': related_count(Post, 'author', 'user_id'),
+        'followers_count': related_count(Follow, 'author', 'user_id'),
+        'following_count': related_count(Follow, 'user', 'user_id'),
+    }
+
+
+def post_counters():
+    return {'comments_count': related_count(Comment, 'post')}
+
+
+def reconcile(queryset, counters, batch_size=BATCH_SIZE):
+    """Пересчитывает разошедшиеся счётчики пачками по pk.
+
+    Возвращает число исправленных строк.
+    """
+    fixed = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            queryset.filter(pk__gt=last_pk).order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not batch:
+            return fixed
+        last_pk = batch[-1]
+        drift = Q()
+        for field in counters:
+            drift |= ~Q(**{field: F(f'actual_{field}')})
+        stale = list(
+            queryset.filter(pk__in=batch)
+            .annotate(**{
+                f'actual_{field}': expression
+                for field, expression in counters.items()
+            })
+            .filter(drift)
+            .values_list('pk', flat=True)
+        )
+        if stale:
+            queryset.filter(pk__in=stale).update(**counters)
+            fixed += len(stale)
@@ -0,0 +1,188 @@
+from itertools import islice
+from operator import attrgetter
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db.models import Max
+
+from core.jobs import enqueue
+from users.models import Profile
+from .models import Follow, Post, TimelineEntry
+from .paginators import MergedCursorPaginator, POST_KEYS
+
+BATCH_SIZE: int = 1000
+TIMELINE_KEYS = ('pub_date', 'post_id')
+RESUME_JOB = 'posts.feeds.resume_push'
+
+
+def _bulk_insert(entries):
+    entries = iter(entries)
+    while True:
+        batch = list(islice(entries, BATCH_SIZE))
+        if not batch:
+            break
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def is_pulled(author_id):
+    """Посты авторов с большим числом подписчиков не раскладываются
+    по лентам при записи, а подмешиваются при чтении."""
+    return Profile.objects.filter(
+        user_id=author_id, feed_pulled=True
+    ).exists()
+
+
+def pulled_authors(user):
+    return list(Follow.objects.filter(
+        user=user, author__profile__feed_pulled=True
+    ).values_list('author_id', flat=True))
+
+
+def resume_threshold():
+    return int(settings.FEED_PULL_THRESHOLD * settings.FEED_RESUME_RATIO)
+
+
+def sync_pulled(author_id=None):
+    """Сверяет Profile.feed_pulled с followers_count автора или всех.
+
+    Достигший FEED_PULL_THRESHOLD автор сразу начинает подтягиваться.
+    Обратно, ниже resume_threshold(), его переводит фоновая задача
+    resume_push: ей нужно дозаполнить ленты всех подписчиков.
+    """
+    profiles = Profile.objects.all()
+    if author_id is not None:
+        profiles = profiles.filter(user_id=author_id)
+    profiles.filter(
+        feed_pulled=False, followers_count__gte=settings.FEED_PULL_THRESHOLD
+    ).update(feed_pulled=True)
+    resumed = profiles.filter(
+        feed_pulled=True, followers_count__lt=resume_threshold()
+    ).values_list('user_id', flat=True)
+    for author_id in resumed.iterator():
+        enqueue(
+            RESUME_JOB, key=f'resume_push:{author_id}', author_id=author_id
+        )
+
+
+def push_post(post):
+    """Раскладывает новый пост по лентам подписчиков автора."""
+    if is_pulled(post.author_id):
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)
+    _bulk_insert(
+        TimelineEntry(
+            user_id=user_id,
+            post_id=post.pk,
+            author_id=post.author_id,
+            pub_date=post.pub_date
+        )
+        for user_id in followers.iterator()
+    )
+
+
+def fill(user_id, author_id, posts):
+    """Кладёт в ленту user_id посты автора: список (pk, pub_date)."""
+    _bulk_insert(
+        TimelineEntry(
+            user_id=user_id,
+            post_id=post_id,
+            author_id=author_id,
+            pub_date=pub_date
+        )
+        for post_id, pub_date in posts
+    )
+
+
+def backfill(user_id, author_id):
+    if is_pulled(author_id):
+        return
+    posts = Post.objects.filter(
+        author_id=author_id
+    ).values_list('pk', 'pub_date')
+    fill(user_id, author_id, posts.iterator())
+
+
+def fill_followers(author_id, follows, posts):
+    """Ленты подписчиков из follows дополняются постами posts —
+    по одному подписчику за раз."""
+    posts = list(posts.values_list('pk', 'pub_date'))
+    if not posts:
+        return
+    for user_id in follows.values_list('user_id', flat=True).iterator():
+        fill(user_id, author_id, posts)
+
+
+def resume_push(author_id):
+    """Фоновая задача: автор снова раскладывается по лентам.
+
+    Пока он подтягивался, его посты не раскладывались, а новые
+    подписчики не получали старых. Ленты дополняются, пока флаг ещё
+    стоит и читатели берут его посты напрямую; после снятия флага
+    досылается то, что появилось за время заполнения.
+    """
+    if not Profile.objects.filter(
+            user_id=author_id, feed_pulled=True,
+            followers_count__lt=resume_threshold()).exists():
+        return
+    posts = Post.objects.filter(author_id=author_id)
+    follows = Follow.objects.filter(author_id=author_id)
+    last_post = posts.aggregate(last=Max('pk'))['last'] or 0
+    last_follow = follows.aggregate(last=Max('pk'))['last'] or 0
+    fill_followers(author_id, follows, posts.filter(pk__lte=last_post))
+
+    Profile.objects.filter(user_id=author_id).update(feed_pulled=False)
+    fill_followers(author_id, follows.filter(pk__gt=last_follow), posts)
+    fill_followers(
+        author_id, follows.filter(pk__lte=last_follow),
+        posts.filter(pk__gt=last_post)
+    )
+    # Отписавшиеся во время заполнения могли получить его посты.
+    TimelineEntry.objects.filter(author_id=author_id).exclude(
+        user_id__in=follows.values('user_id')
+    ).delete()
+
+
+def prune(user_id, author_id):
+    TimelineEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def rebuild(user_ids=None):
+    """Пересобирает ленты с нуля по текущим подпискам."""
+    entries = TimelineEntry.objects.all()
+    follows = Follow.objects.all()
+    if user_ids is not None:
+        entries = entries.filter(user_id__in=user_ids)
+        follows = follows.filter(user_id__in=user_ids)
+    entries.delete()
+    pairs = follows.values_list('user_id', 'author_id').distinct()
+    for user_id, author_id in pairs.iterator():
+        backfill(user_id, author_id)
+
+
+def get_follow_page(request, per_page, pulled):
+    """Лента подписок: материализованная часть плюс посты «звёзд».
+
+    Записи из TimelineEntry и посты авторов из pulled сливаются
+    по (pub_date, id) в одну курсорную страницу.
+    """
+    user = request.user
+    page_number = request.GET.get('page')
+    if page_number is not None:
+        posts = Post.objects.followed_by(user).feed()
+        return Paginator(posts, per_page).get_page(page_number)
+
+    timeline = TimelineEntry.objects.filter(user=user).exclude(
+        author_id__in=pulled
+    ).feed()
+    sources = [(timeline, TIMELINE_KEYS, attrgetter('post'))]
+    if pulled:
+        sources.append((
+            Post.objects.filter(author_id__in=pulled).feed(),
+            POST_KEYS,
+            None
+        ))
+    return MergedCursorPaginator(sources, per_page).get_page(
+        request.GET.get('cursor')
+    )
@@ -1,5 +1,7 @@
+from django.core.files.uploadedfile import UploadedFile
 from django.forms import ModelForm
 from .models import Post, Comment
+from .uploads import check_header, sanitize
 
 
 class PostForm(ModelForm):
@@ -7,6 +9,19 @@ class PostForm(ModelForm):
         model = Post
         fields = ['text', 'group', 'image']
 
+    def __init__(self, *args, upload_errors=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.upload_errors = upload_errors or {}
+
+    def clean_image(self):
+        if 'image' in self.upload_errors:
+            raise self.upload_errors['image']
+        image = self.cleaned_data['image']
+        if isinstance(image, UploadedFile):
+            check_header(image)
+            image = sanitize(image)
+        return image
+
 
 class CommentForm(ModelForm):
     class Meta:
@@ -0,0 +1,38 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from posts import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Многопоточная нагрузка чтением и записью постов: умолчания SQLite '
+        'против SQLITE_PRAGMAS, отчёт в JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=8,
+            help='Число параллельных потоков'
+        )
+        parser.add_argument(
+            '--seconds',
+            type=float,
+            default=10.0,
+            help='Длительность каждого прогона'
+        )
+        parser.add_argument(
+            '--write-ratio',
+            type=float,
+            default=0.1,
+            help='Доля операций записи'
+        )
+
+    def handle(self, *args, threads, seconds, write_ratio, **options):
+        self.stdout.write(json.dumps(
+            benchmark.run_concurrency(threads, seconds, write_ratio),
+            ensure_ascii=False, indent=2
+        ))
@@ -0,0 +1,36 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from posts import benchmark
+
+
+class Command(BaseCommand):
+    help = 'Замеряет время, запросы и память страниц posts, отчёт в JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Сколько раз запрашивать каждую страницу'
+        )
+        parser.add_argument(
+            '--cold',
+            action='store_true',
+            help='Очищать кэш перед каждым запросом'
+        )
+        parser.add_argument(
+            '--output',
+            help='Записать отчёт в файл вместо stdout'
+        )
+
+    def handle(self, *args, repeat, cold, output, **options):
+        report = json.dumps(
+            benchmark.run(repeat, cold), ensure_ascii=False, indent=2
+        )
+        if output:
+            with open(output, 'w') as file:
+                file.write(report)
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from posts import storage
+
+
+class Command(BaseCommand):
+    help = 'Удаляет картинки, на которые не ссылается ни один пост'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только посчитать, ничего не удалять'
+        )
+
+    def handle(self, *args, dry_run, **options):
+        deleted, freed = storage.collect_garbage(dry_run)
+        action = 'Будет удалено' if dry_run else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} файлов: {deleted}, {freed} байт'
+        ))
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand
+
+from posts import synthetic
+
+
+class Command(BaseCommand):
+    help = 'Наполняет базу синтетическими данными для нагрузочных замеров'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument(
+            '--follows',
+            type=int,
+            default=30,
+            help='Среднее число подписок на пользователя'
+        )
+        parser.add_argument(
+            '--images',
+            type=int,
+            default=10,
+            help='Сколько разных картинок сгенерировать для постов'
+        )
+        parser.add_argument(
+            '--image-ratio',
+            type=float,
+            default=0.2,
+            help='Доля постов с картинкой'
+        )
+        parser.add_argument(
+            '--alpha',
+            type=float,
+            default=1.2,
+            help='Показатель степенного распределения популярности'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='За сколько дней распределить даты публикаций'
+        )
+        parser.add_argument('--seed', type=int)
+        parser.add_argument(
+            '--batch-size', type=int, default=synthetic.BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        created = synthetic.generate(
+            users=options['users'],
+            groups=options['groups'],
+            posts=options['posts'],
+            comments=options['comments'],
+            follows=options['follows'],
+            images=options['images'],
+            image_ratio=options['image_ratio'],
+            alpha=options['alpha'],
+            days=options['days'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            'Создано: ' + ', '.join(
+                f'{name} {count}' for name, count in created.items()
+            )
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from posts import feeds
+from posts.models import User
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает материализованные ленты подписок'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            action='append',
+            dest='usernames',
+            help='Пересобрать ленту только этого пользователя'
+        )
+
+    def handle(self, *args, usernames=None, **options):
+        user_ids = None
+        if usernames:
+            user_ids = list(User.objects.filter(
+                username__in=usernames
+            ).values_list('pk', flat=True))
+        feeds.rebuild(user_ids)
+        self.stdout.write(self.style.SUCCESS('Ленты пересобраны'))
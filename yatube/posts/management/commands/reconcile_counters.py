@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from posts import counters, feeds
+from posts.models import Post
+from users.models import Profile
+
+
+class Command(BaseCommand):
+    help = 'Исправляет расхождения денормализованных счётчиков'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=counters.BATCH_SIZE,
+            help='Сколько строк проверять за один запрос'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        profiles = counters.reconcile(
+            Profile.objects.all(), counters.profile_counters(), batch_size
+        )
+        posts = counters.reconcile(
+            Post.objects.all(), counters.post_counters(), batch_size
+        )
+        # Исправленные followers_count могли перейти порог подтягивания.
+        feeds.sync_pulled()
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено профилей: {profiles}, постов: {posts}'
+        ))
@@ -0,0 +1,14 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает вес вариантов картинок постов с оригиналами, JSON'
+
+    def handle(self, *args, **options):
+        self.stdout.write(json.dumps(
+            thumbnails.savings(), ensure_ascii=False, indent=2
+        ))
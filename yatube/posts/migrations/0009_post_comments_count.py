@@ -0,0 +1,34 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:08
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comments_count(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    comments = Comment.objects.filter(post=OuterRef('pk')).order_by()
+    Post.objects.update(comments_count=Coalesce(
+        Subquery(
+            comments.values('post').annotate(total=Count('pk')).values('total'),
+            output_field=models.IntegerField()
+        ),
+        0
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_timelineentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='комментариев'),
+        ),
+        migrations.RunPython(fill_comments_count, migrations.RunPython.noop),
+    ]
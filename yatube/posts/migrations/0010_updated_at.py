@@ -0,0 +1,32 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:14
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_updated_at(apps, schema_editor):
+    apps.get_model('posts', 'Post').objects.update(updated_at=F('pub_date'))
+    apps.get_model('posts', 'Comment').objects.update(
+        updated_at=F('created')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_post_comments_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='дата изменения'),
+        ),
+        migrations.RunPython(fill_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:29
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_follows(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    Profile = apps.get_model('users', 'Profile')
+    duplicates = Follow.objects.values('user', 'author').annotate(
+        keep=Min('pk'), total=Count('pk')
+    ).filter(total__gt=1)
+    for row in duplicates:
+        Follow.objects.filter(
+            user=row['user'], author=row['author']
+        ).exclude(pk=row['keep']).delete()
+        Profile.objects.filter(user_id=row['user']).update(
+            following_count=Follow.objects.filter(user=row['user']).count()
+        )
+        Profile.objects.filter(user_id=row['author']).update(
+            followers_count=Follow.objects.filter(
+                author=row['author']
+            ).count()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0010_updated_at'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_follows, migrations.RunPython.noop
+        ),
+        migrations.AlterUniqueTogether(
+            name='follow',
+            unique_together={('user', 'author')},
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', '-created', '-id'], name='comment_post_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-pub_date', '-id'], name='post_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-pub_date', '-id'], name='post_author_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', '-pub_date', '-id'], name='post_group_feed_idx'),
+        ),
+    ]
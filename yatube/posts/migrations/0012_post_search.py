@@ -0,0 +1,67 @@
+from django.db import migrations
+
+# Внешний FTS5-индекс по posts_post.text. Триггеры держат его в
+# актуальном состоянии при любой записи, включая bulk_create и update().
+# SQLite пересоздаёт таблицу при изменении полей Post и теряет триггеры:
+# такие миграции должны повторно выполнить CREATE TRIGGER отсюда.
+CREATE_SEARCH = [
+    """
+    CREATE VIRTUAL TABLE posts_post_search USING fts5(
+        text,
+        content='posts_post',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER posts_post_search_insert AFTER INSERT ON posts_post
+    BEGIN
+        INSERT INTO posts_post_search(rowid, text)
+        VALUES (new.id, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_post_search_delete AFTER DELETE ON posts_post
+    BEGIN
+        INSERT INTO posts_post_search(posts_post_search, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_post_search_update AFTER UPDATE OF text ON posts_post
+    BEGIN
+        INSERT INTO posts_post_search(posts_post_search, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO posts_post_search(rowid, text)
+        VALUES (new.id, new.text);
+    END
+    """,
+    "INSERT INTO posts_post_search(posts_post_search) VALUES ('rebuild')",
+]
+
+DROP_SEARCH = [
+    'DROP TRIGGER IF EXISTS posts_post_search_insert',
+    'DROP TRIGGER IF EXISTS posts_post_search_delete',
+    'DROP TRIGGER IF EXISTS posts_post_search_update',
+    'DROP TABLE IF EXISTS posts_post_search',
+]
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(CREATE_SEARCH), run(DROP_SEARCH)),
+    ]
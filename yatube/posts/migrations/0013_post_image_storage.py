@@ -0,0 +1,35 @@
+from importlib import import_module
+
+from django.db import migrations, models
+import posts.storage
+
+search = import_module('posts.migrations.0012_post_search')
+
+# AlterField в SQLite пересоздаёт posts_post, а вместе с ней пропадают
+# триггеры полнотекстового индекса: их нужно создать заново. Данные
+# не меняются, поэтому перестраивать сам индекс не нужно.
+CREATE_TRIGGERS = [
+    statement for statement in search.CREATE_SEARCH
+    if 'CREATE TRIGGER' in statement
+]
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_post_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(noop, search.run(CREATE_TRIGGERS)),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=posts.storage.ContentAddressedStorage(), upload_to='posts/', verbose_name='Картинка'),
+        ),
+        migrations.RunPython(search.run(CREATE_TRIGGERS), noop),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from .storage import ContentAddressedStorage
 
 User = get_user_model()
 
@@ -14,6 +15,23 @@ class Group(models.Model):
         return self.title
 
 
+# Поля, которые выводят ленты (карточки posts.cards и теги кэша).
+FEED_FIELDS = (
+    'text', 'pub_date', 'image', 'updated_at', 'comments_count',
+    'author', 'author__username', 'author__first_name', 'author__last_name',
+    'group', 'group__slug', 'group__title',
+)
+
+
+class PostQuerySet(models.QuerySet):
+    def feed(self):
+        """Посты для лент: автор и группа одним JOIN, без лишних колонок."""
+        return self.select_related('author', 'group').only(*FEED_FIELDS)
+
+    def followed_by(self, user):
+        return self.filter(author__following__user=user)
+
+
 class Post(models.Model):
     text = models.TextField(
         verbose_name='текст',
@@ -41,14 +59,54 @@ class Post(models.Model):
     image = models.ImageField(
         'Картинка',
         upload_to='posts/',
+        storage=ContentAddressedStorage(),
         blank=True
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='дата изменения'
+    )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='комментариев'
+    )
+
+    objects = PostQuerySet.as_manager()
+
+    COUNTERS = ('comments_count',)
 
     def __str__(self):
         return self.text[:15]
 
+    def save(self, *args, **kwargs):
+        # Счётчики меняются только F()-выражениями из сигналов, поэтому
+        # при обновлении поста их значения из памяти не записываются.
+        if (not self._state.adding and not kwargs.get('force_insert')
+                and kwargs.get('update_fields') is None):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTERS
+            ]
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['-pub_date']
+        # Индексы повторяют ORDER BY курсорной пагинации (pub_date, id),
+        # чтобы страница читалась по индексу без сортировки.
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'], name='post_feed_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_feed_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_feed_idx'
+            ),
+        ]
 
 
 class Comment(models.Model):
@@ -71,12 +129,22 @@ class Comment(models.Model):
         auto_now_add=True,
         verbose_name='дата создания'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='дата изменения'
+    )
 
     def __str__(self):
         return self.text[:15]
 
     class Meta:
         ordering = ['-created']
+        indexes = [
+            models.Index(
+                fields=['post', '-created', '-id'],
+                name='comment_post_feed_idx'
+            ),
+        ]
 
 
 class Follow(models.Model):
@@ -95,3 +163,57 @@ class Follow(models.Model):
 
     def __str__(self):
         return f'{self.user} -> {self.author}'
+
+    class Meta:
+        unique_together = ('user', 'author')
+
+
+class TimelineEntryQuerySet(models.QuerySet):
+    def feed(self):
+        return self.select_related('post__author', 'post__group').only(
+            'pub_date', 'post_id',
+            *(f'post__{field}' for field in FEED_FIELDS)
+        )
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        to=User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='подписчик'
+    )
+    post = models.ForeignKey(
+        to=Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='пост'
+    )
+    author = models.ForeignKey(
+        to=User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='автор'
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='дата публикации'
+    )
+
+    objects = TimelineEntryQuerySet.as_manager()
+
+    def __str__(self):
+        return f'{self.user_id} <- {self.post_id}'
+
+    class Meta:
+        ordering = ['-pub_date', '-post']
+        unique_together = ('user', 'post')
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='timeline_user_feed_idx'
+            ),
+            models.Index(
+                fields=['user', 'author'],
+                name='timeline_user_author_idx'
+            ),
+        ]
@@ -0,0 +1,112 @@
+from functools import wraps
+from hashlib import md5
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from core.routers import reads_replica
+from .caching import get_versions, bump_versions, source_keys
+
+SURROGATE_KEY_HEADER = 'Surrogate-Key'
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+PAGE_KEY = 'page:{}:{}'
+TAG_KEY = 'tag:{}'
+# Растёт при каждом purge(). Ответ, во время рендера которого был
+# purge, не кэшируется: он мог прочитать базу до записи, а версии
+# тегов — уже после.
+PURGE_COUNT_KEY = 'purge_count'
+
+
+def post_tags(post):
+    tags = {f'post:{post.pk}', f'author:{post.author_id}'}
+    if post.group_id:
+        tags.add(f'group:{post.group_id}')
+    return tags
+
+
+def tag_response(response, tags, posts=()):
+    """Помечает ответ суррогатными тегами всех показанных объектов."""
+    tags = set(tags)
+    for post in posts:
+        tags |= post_tags(post)
+    response[SURROGATE_KEY_HEADER] = ' '.join(sorted(tags))
+    return response
+
+
+def purge_count():
+    return cache.get(PURGE_COUNT_KEY, 0)
+
+
+def purge(tags):
+    # Счётчик растёт раньше версий: рендер, заставший новые версии,
+    # обязательно увидит и новый счётчик.
+    try:
+        cache.incr(PURGE_COUNT_KEY)
+    except ValueError:
+        cache.set(PURGE_COUNT_KEY, 1, None)
+    bump_versions([TAG_KEY.format(tag) for tag in tags])
+
+
+def cache_anonymous_page(timeout):
+    """Кэширует целиком ответы анонимным GET-запросам.
+
+    Вместе с ответом сохраняются версии его тегов; страница считается
+    устаревшей, как только любой из тегов сброшен через purge().
+    Страница, собранная с реплики, устаревает и с её обновлением.
+    Попадание в кэш обходится двумя обращениями к кэшу, без базы.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (request.method not in ('GET', 'HEAD')
+                    or request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+
+            # Страницы с реплики и с основной базы хранятся раздельно.
+            key = PAGE_KEY.format(
+                'replica' if reads_replica() else 'primary',
+                md5(request.get_full_path().encode()).hexdigest()
+            )
+            entry = cache.get(key)
+            if entry is not None:
+                content, content_type, tags, versions, validators = entry
+                if cache.get_many(versions) == versions:
+                    response = HttpResponse(content, content_type=content_type)
+                    response[SURROGATE_KEY_HEADER] = tags
+                    for header, value in validators.items():
+                        response[header] = value
+                    return get_conditional_response(
+                        request,
+                        etag=validators.get('ETag'),
+                        last_modified=parse_http_date_safe(
+                            validators.get('Last-Modified')
+                        ),
+                        response=response
+                    )
+
+            purges = purge_count()
+            response = view(request, *args, **kwargs)
+            tags = response.get(SURROGATE_KEY_HEADER)
+            if response.status_code == 200 and tags:
+                keys = source_keys(
+                    TAG_KEY.format(tag) for tag in tags.split()
+                )
+                versions = dict(zip(keys, get_versions(keys)))
+                if purge_count() != purges:
+                    return response
+                validators = {
+                    header: response[header]
+                    for header in VALIDATOR_HEADERS
+                    if response.has_header(header)
+                }
+                cache.set(
+                    key,
+                    (response.content, response['Content-Type'],
+                     tags, versions, validators),
+                    timeout
+                )
+            return response
+        return wrapper
+    return decorator
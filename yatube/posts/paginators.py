@@ -0,0 +1,153 @@
+from heapq import merge
+from itertools import islice
+
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+FORWARD = 'n'
+BACKWARD = 'p'
+POST_KEYS = ('pub_date', 'pk')
+COMMENT_KEYS = ('created', 'pk')
+
+
+def encode_cursor(direction, position=None):
+    if position:
+        key, pk = position
+        key = key.isoformat() if hasattr(key, 'isoformat') else repr(key)
+        position = f'{key}|{pk}'
+    else:
+        position = '|'
+    return urlsafe_base64_encode(f'{direction}|{position}'.encode())
+
+
+def decode_cursor(cursor, parse=parse_datetime):
+    """Возвращает (направление, (ключ, pk) или None).
+
+    Ключ — обычно дата публикации, parse переводит его из строки.
+    Битый курсор трактуется как первая страница, как и битый ?page=.
+    """
+    if not cursor:
+        return FORWARD, None
+    try:
+        direction, key, pk = (
+            urlsafe_base64_decode(cursor).decode().split('|')
+        )
+    except (TypeError, ValueError):
+        return FORWARD, None
+    if direction not in (FORWARD, BACKWARD):
+        return FORWARD, None
+    if not key and not pk:
+        return direction, None
+    try:
+        position = (parse(key), int(pk))
+    except ValueError:
+        return FORWARD, None
+    if position[0] is None:
+        return FORWARD, None
+    return direction, position
+
+
+class CursorPaginator(Paginator):
+    """Keyset-пагинация по паре (дата, id) без COUNT(*) и OFFSET.
+
+    Страница читается одним запросом по индексу, поэтому время ответа
+    не зависит от глубины страницы. Номера страниц неизвестны: number
+    и num_pages лишь отражают наличие соседних страниц, чтобы методы
+    стандартного Page (has_next, has_previous) продолжали работать.
+    """
+
+    is_cursor = True
+
+    def __init__(self, object_list, per_page, keys=POST_KEYS):
+        super().__init__(object_list, per_page)
+        self.keys = keys
+        self._num_pages = 1
+
+    @property
+    def num_pages(self):
+        return self._num_pages
+
+    @property
+    def last_cursor(self):
+        return encode_cursor(BACKWARD)
+
+    def parse_key(self, value):
+        return parse_datetime(value)
+
+    def read(self, queryset, keys, position, forward, transform=None):
+        """Читает per_page + 1 строк после позиции как пары (ключ, объект)."""
+        date_key, id_key = keys
+        lookup = 'lt' if forward else 'gt'
+        if forward:
+            queryset = queryset.order_by(f'-{date_key}', f'-{id_key}')
+        else:
+            queryset = queryset.order_by(date_key, id_key)
+        if position:
+            pub_date, pk = position
+            queryset = queryset.filter(
+                Q(**{f'{date_key}__{lookup}': pub_date})
+                | Q(**{date_key: pub_date, f'{id_key}__{lookup}': pk})
+            )
+        return [
+            (
+                (getattr(row, date_key), getattr(row, id_key)),
+                transform(row) if transform else row
+            )
+            for row in queryset[:self.per_page + 1]
+        ]
+
+    def fetch(self, position, forward):
+        return self.read(self.object_list, self.keys, position, forward)
+
+    def get_page(self, cursor=None):
+        direction, position = decode_cursor(cursor, self.parse_key)
+        forward = direction == FORWARD
+        rows = self.fetch(position, forward)
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        has_before = position is not None and bool(rows)
+        if forward:
+            has_previous, has_next = has_before, has_more
+        else:
+            rows.reverse()
+            has_previous, has_next = has_more, has_before
+
+        number = 2 if has_previous else 1
+        self._num_pages = number + 1 if has_next else number
+        page = Page([obj for key, obj in rows], number, self)
+        page.previous_cursor = (
+            encode_cursor(BACKWARD, rows[0][0]) if has_previous else None
+        )
+        page.next_cursor = (
+            encode_cursor(FORWARD, rows[-1][0]) if has_next else None
+        )
+        return page
+
+
+class MergedCursorPaginator(CursorPaginator):
+    """Курсорная страница из нескольких источников (k-way merge).
+
+    object_list — список троек (queryset, keys, transform). Ключи всех
+    источников должны описывать одно и то же упорядочение, например
+    (pub_date, id поста), а transform приводит строку к объекту ленты.
+    """
+
+    def fetch(self, position, forward):
+        streams = [
+            self.read(queryset, keys, position, forward, transform)
+            for queryset, keys, transform in self.object_list
+        ]
+        rows = merge(*streams, key=lambda row: row[0], reverse=forward)
+        return list(islice(rows, self.per_page + 1))
+
+
+def get_page_obj(request, queryset, per_page, keys=POST_KEYS):
+    """Страница ленты: курсорная, либо по номеру для старых ссылок."""
+    page_number = request.GET.get('page')
+    if page_number is not None:
+        return Paginator(queryset, per_page).get_page(page_number)
+    return CursorPaginator(queryset, per_page, keys).get_page(
+        request.GET.get('cursor')
+    )
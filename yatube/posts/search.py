@@ -0,0 +1,105 @@
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .models import Post
+from .paginators import CursorPaginator, POST_KEYS
+
+SEARCH_TABLE = 'posts_post_search'
+WORDS = re.compile(r'\w+')
+MAX_WORDS: int = 10
+# Запасной предел: если совпадений больше, ранжируются только столько
+# самых свежих, а страница помечается как неполная. bm25 считается для
+# каждого кандидата — около 1 мкс на строку, так что предел держит
+# время ответа в пределах пары десятков миллисекунд.
+MAX_RANKED: int = 20000
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def build_query(text):
+    """Строка запроса FTS5: все слова по префиксу, синтаксис экранирован.
+
+    Слова берутся в кавычки, поэтому AND, NOT, скобки и двоеточия
+    из пользовательского ввода не становятся операторами.
+    """
+    words = WORDS.findall(text)[:MAX_WORDS]
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def matching_ids(text):
+    """Подзапрос с id постов, подходящих под запрос, — для filter(pk__in)."""
+    return RawSQL(
+        f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s',
+        [build_query(text)]
+    )
+
+
+class SearchPaginator(CursorPaginator):
+    """Курсорная пагинация результатов поиска по релевантности.
+
+    Ключ страницы — (rank, id): rank считает FTS5 (bm25, чем меньше,
+    тем релевантнее), поэтому курсор хранит число, а не дату. Ранжируются
+    все совпадения, а если их больше MAX_RANKED — только MAX_RANKED
+    новейших; тогда у страницы truncated = True, и шаблон просит
+    уточнить запрос.
+    """
+
+    def __init__(self, query, per_page):
+        super().__init__(query, per_page, keys=('rank', 'pk'))
+        self.truncated = False
+
+    def get_page(self, cursor=None):
+        page = super().get_page(cursor)
+        page.truncated = self.truncated
+        return page
+
+    def parse_key(self, value):
+        return float(value)
+
+    def fetch(self, position, forward):
+        # Совпадение, следующее за MAX_RANKED новейшими; есть только
+        # у слишком частых слов, и окно тогда начинается после него.
+        floor = (
+            f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s '
+            f'ORDER BY rowid DESC LIMIT 1 OFFSET %s'
+        )
+        sql = (
+            f'SELECT rowid, rank, ({floor}) IS NOT NULL '
+            f'FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s '
+            f'AND rowid > COALESCE(({floor}), 0)'
+        )
+        params = [
+            self.object_list, MAX_RANKED, self.object_list,
+            self.object_list, MAX_RANKED,
+        ]
+        if position:
+            sign = '>' if forward else '<'
+            sql += f' AND (rank {sign} %s OR (rank = %s AND rowid {sign} %s))'
+            rank, pk = position
+            params += [rank, rank, pk]
+        order = '' if forward else ' DESC'
+        sql += f' ORDER BY rank{order}, rowid{order} LIMIT %s'
+        params.append(self.per_page + 1)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+        self.truncated = any(truncated for _, _, truncated in rows)
+        posts = Post.objects.feed().in_bulk([pk for pk, _, _ in rows])
+        return [
+            ((rank, pk), posts[pk]) for pk, rank, _ in rows if pk in posts
+        ]
+
+
+def search(text, cursor, per_page):
+    """Страница результатов поиска постов по тексту."""
+    if not is_available():
+        return CursorPaginator(
+            Post.objects.feed().filter(text__icontains=text),
+            per_page, POST_KEYS
+        ).get_page(cursor)
+    return SearchPaginator(build_query(text), per_page).get_page(cursor)
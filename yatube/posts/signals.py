@@ -0,0 +1,96 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import caching, counters, feeds, page_cache
+from .models import Comment, Follow, Group, Post, User
+
+
+def purge_post_pages(post):
+    page_cache.purge(page_cache.post_tags(post) | {'index'})
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        counters.bump_profile(instance.author_id, 'posts_count', 1)
+        feeds.push_post(instance)
+    caching.bump_author_feeds(instance.author_id)
+    purge_post_pages(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.bump_profile(instance.author_id, 'posts_count', -1)
+    caching.bump_author_feeds(instance.author_id)
+    purge_post_pages(instance)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.bump_profile(instance.user_id, 'following_count', 1)
+        counters.bump_profile(instance.author_id, 'followers_count', 1)
+        feeds.sync_pulled(instance.author_id)
+        feeds.backfill(instance.user_id, instance.author_id)
+        caching.bump_feed(instance.user_id)
+        page_cache.purge([
+            f'author:{instance.user_id}', f'author:{instance.author_id}'
+        ])
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.bump_profile(instance.user_id, 'following_count', -1)
+    counters.bump_profile(instance.author_id, 'followers_count', -1)
+    feeds.prune(instance.user_id, instance.author_id)
+    feeds.sync_pulled(instance.author_id)
+    caching.bump_feed(instance.user_id)
+    page_cache.purge([
+        f'author:{instance.user_id}', f'author:{instance.author_id}'
+    ])
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.bump_comments(instance.post_id, 1)
+        page_cache.purge([f'post:{instance.post_id}'])
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.bump_comments(instance.post_id, -1)
+    page_cache.purge([f'post:{instance.post_id}'])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=User)
+def bump_posts_generation(sender, raw=False, **kwargs):
+    if not raw:
+        caching.bump_posts_generation()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        page_cache.purge([f'group:{instance.pk}'])
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    page_cache.purge([f'author:{instance.pk}'])
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Вход пользователя сохраняет только last_login — страницы
+    # с его постами от этого не меняются.
+    if not raw and update_fields != frozenset(['last_login']):
+        caching.bump_posts_generation()
+        page_cache.purge([f'author:{instance.pk}'])
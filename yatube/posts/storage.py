@@ -0,0 +1,96 @@
+import hashlib
+import os
+from datetime import timedelta
+
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+from sorl.thumbnail import default
+from sorl.thumbnail.images import ImageFile
+
+# Файлы моложе этого не удаляются сборщиком: пост с только что
+# сохранённой картинкой мог ещё не попасть в базу.
+GRACE_PERIOD = timedelta(hours=1)
+
+
+def content_hash(content):
+    """sha256 файла: посчитанный при приёме загрузки или по частям."""
+    digest = getattr(content, 'sha256', None)
+    if digest:
+        return digest
+    hasher = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        hasher.update(chunk)
+    content.seek(0)
+    return hasher.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранилище, где имя файла — хэш его содержимого.
+
+    Каталог из upload_to сохраняется: posts/meme.jpg ложится как
+    posts/ab/ab12….jpg. Одинаковые загрузки получают одно имя, второй
+    раз файл не пишется, а миниатюры sorl, привязанные к имени,
+    переиспользуются.
+    """
+
+    def _save(self, name, content):
+        digest = content_hash(content)
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        name = os.path.join(directory, digest[:2], digest + extension)
+        if self.exists(name):
+            # Свежее время изменения защищает файл от collect_garbage,
+            # пока пост с ним ещё не сохранён.
+            os.utime(self.path(name))
+            return name
+        return super()._save(name, content)
+
+
+def stored_files(storage, directory):
+    """Все файлы каталога хранилища, рекурсивно."""
+    directories, files = storage.listdir(directory)
+    for filename in files:
+        yield os.path.join(directory, filename)
+    for subdirectory in directories:
+        yield from stored_files(storage, os.path.join(directory, subdirectory))
+
+
+def collect_garbage(dry_run=False):
+    """Удаляет картинки постов, на которые не ссылается ни один пост.
+
+    Ссылки считаются по базе: файл живёт, пока его имя есть хотя бы
+    у одного поста; перед удалением это проверяется ещё раз. Вместе
+    с файлом удаляются его миниатюры и записи о них в KV-хранилище
+    sorl. Возвращает (число файлов, байт).
+    """
+    from .models import Post
+
+    field = Post._meta.get_field('image')
+    storage = field.storage
+    referenced = set(
+        Post.objects.exclude(image='').values_list(
+            'image', flat=True
+        ).distinct().iterator()
+    )
+    directory = field.upload_to.rstrip('/')
+    if not storage.exists(directory):
+        return 0, 0
+    fresh_after = timezone.now() - GRACE_PERIOD
+    deleted = freed = 0
+    for name in stored_files(storage, directory):
+        if name in referenced:
+            continue
+        if storage.get_modified_time(name) > fresh_after:
+            continue
+        # Пост с этой картинкой мог появиться, пока шёл обход.
+        if Post.objects.filter(image=name).exists():
+            continue
+        deleted += 1
+        freed += storage.size(name)
+        if not dry_run:
+            default.kvstore.delete(ImageFile(name, storage))
+            storage.delete(name)
+    return deleted, freed
@@ -0,0 +1,218 @@
+import random
+import secrets
+from contextlib import contextmanager
+from datetime import timedelta
+from io import BytesIO
+from itertools import accumulate, islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils import timezone
+from PIL import Image
+
+from users.models import Profile
+from . import counters, feeds
+from .models import Comment, Follow, Group, Post, TimelineEntry, User
+
+BATCH_SIZE: int = 1000
+PASSWORD = 'synthetic'
+IMAGE_SIZE = (960, 540)
+
+
+@contextmanager
+def manual_dates(model):
+    """Позволяет bulk_create записать даты из прошлого.
+
+    auto_now и auto_now_add перезаписали бы их в pre_save.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    flags = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, flags):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def bulk_insert(model, objects, batch_size=BATCH_SIZE):
+    objects = iter(objects)
+    with manual_dates(model):
+        while True:
+            batch = list(islice(objects, batch_size))
+            if not batch:
+                return
+            model.objects.bulk_create(batch)
+
+
+def power_law_weights(size, alpha):
+    """Накопленные веса Ципфа: k-й по популярности получает 1 / k^alpha."""
+    return list(accumulate(1 / rank ** alpha for rank in range(1, size + 1)))
+
+
+def make_images(count, rng):
+    names = []
+    for number in range(count):
+        color = tuple(rng.randrange(256) for _ in range(3))
+        buffer = BytesIO()
+        Image.new('RGB', IMAGE_SIZE, color).save(buffer, 'JPEG')
+        names.append(default_storage.save(
+            f'posts/synthetic_{number}.jpg', ContentFile(buffer.getvalue())
+        ))
+    return names
+
+
+def generate(users, groups, posts, comments, follows, images=0,
+             image_ratio=0.2, alpha=1.2, days=365, seed=None,
+             batch_size=BATCH_SIZE):
+    """Наполняет базу синтетическими данными заданного объёма.
+
+    Сигналы при bulk_create не срабатывают, поэтому профили, счётчики
+    и ленты подписок достраиваются в конце, как после миграции.
+    Возвращает словарь с числом созданных объектов.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    # Метка имён не зависит от seed: повторный запуск с тем же seed
+    # добавляет такой же по форме набор, а не сталкивается с прежним.
+    tag = secrets.token_hex(4)
+
+    def moment():
+        return now - timedelta(seconds=rng.randrange(days * 24 * 60 * 60))
+
+    with transaction.atomic():
+        password = make_password(PASSWORD)
+        bulk_insert(User, (
+            User(
+                username=f'user_{tag}_{number}',
+                first_name='Пользователь',
+                last_name=str(number),
+                password=password
+            )
+            for number in range(users)
+        ), batch_size)
+        new_users = User.objects.filter(username__startswith=f'user_{tag}_')
+        user_ids = list(new_users.values_list('pk', flat=True))
+        bulk_insert(Profile, (
+            Profile(user_id=user_id) for user_id in user_ids
+        ), batch_size)
+
+        bulk_insert(Group, (
+            Group(
+                title=f'Группа {tag} {number}',
+                slug=f'group-{tag}-{number}',
+                description='Синтетическая группа'
+            )
+            for number in range(groups)
+        ), batch_size)
+        group_ids = list(Group.objects.filter(
+            slug__startswith=f'group-{tag}-'
+        ).values_list('pk', flat=True))
+
+        # Популярность авторов и их подписчиков подчиняется степенному
+        # закону: несколько «звёзд» и длинный хвост.
+        ranking = user_ids[:]
+        rng.shuffle(ranking)
+        weights = power_law_weights(len(ranking), alpha)
+        image_names = make_images(images, rng)
+
+        def make_post(number):
+            date = moment()
+            with_image = image_names and rng.random() < image_ratio
+            return Post(
+                text=f'Синтетический пост {number}',
+                author_id=rng.choices(ranking, cum_weights=weights)[0],
+                group_id=(
+                    rng.choice(group_ids)
+                    if group_ids and rng.random() < 0.7 else None
+                ),
+                image=rng.choice(image_names) if with_image else '',
+                pub_date=date,
+                updated_at=date
+            )
+
+        bulk_insert(Post, (make_post(n) for n in range(posts)), batch_size)
+        new_posts = Post.objects.filter(author__in=new_users)
+        post_ids = list(new_posts.values_list('pk', flat=True))
+
+        def make_comment(number):
+            date = moment()
+            return Comment(
+                text=f'Синтетический комментарий {number}',
+                post_id=rng.choice(post_ids),
+                author_id=rng.choice(user_ids),
+                created=date,
+                updated_at=date
+            )
+
+        if post_ids and user_ids:
+            bulk_insert(
+                Comment, (make_comment(n) for n in range(comments)),
+                batch_size
+            )
+
+        def make_follows():
+            for user_id in user_ids:
+                size = min(
+                    int(rng.expovariate(1 / follows)) if follows else 0,
+                    len(ranking) - 1
+                )
+                authors = set(
+                    rng.choices(ranking, cum_weights=weights, k=size)
+                )
+                authors.discard(user_id)
+                for author_id in authors:
+                    yield Follow(user_id=user_id, author_id=author_id)
+
+        bulk_insert(Follow, make_follows(), batch_size)
+
+        counters.reconcile(
+            Profile.objects.filter(user__in=new_users),
+            counters.profile_counters()
+        )
+        counters.reconcile(new_posts, counters.post_counters())
+        feeds.sync_pulled()
+        fill_timelines(new_users)
+    cache.clear()
+    return {
+        'users': len(user_ids),
+        'groups': len(group_ids),
+        'posts': len(post_ids),
+        'comments': Comment.objects.filter(post__in=new_posts).count(),
+        'follows': Follow.objects.filter(user__in=new_users).count(),
+        'images': len(image_names),
+    }
+
+
+def fill_timelines(users):
+    """Раскладывает посты по лентам подписок users одним INSERT ... SELECT.
+
+    Построчный backfill на миллионах записей занял бы часы.
+    """
+    rows = Follow.objects.filter(
+        user__in=users, author__posts__isnull=False
+    ).exclude(
+        author__profile__feed_pulled=True
+    ).values_list(
+        'user_id', 'author__posts__id', 'author_id', 'author__posts__pub_date'
+    )
+    select, params = rows.query.sql_with_params()
+    meta = TimelineEntry._meta
+    columns = ', '.join(
+        connection.ops.quote_name(meta.get_field(name).column)
+        for name in ('user', 'post', 'author', 'pub_date')
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {connection.ops.quote_name(meta.db_table)} '
+            f'({columns}) {select}',
+            params
+        )
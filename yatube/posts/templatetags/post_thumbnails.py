@@ -0,0 +1,17 @@
+from django import template
+
+from posts import thumbnails
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_picture(post, preset):
+    """srcset, размеры и запасной src картинки поста для <picture>.
+
+    Берётся из post.pictures, если их уже заполнил prefetch_pictures.
+    """
+    pictures = getattr(post, 'pictures', {})
+    if preset in pictures:
+        return pictures[preset]
+    return thumbnails.picture(post.image, preset)
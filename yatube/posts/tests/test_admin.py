@@ -0,0 +1,93 @@
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from ..admin import CappedCountPaginator
+from ..models import Comment, Follow, Group, Post, User
+
+
+class SmallPaginator(CappedCountPaginator):
+    COUNT_LIMIT = 3
+
+
+class AdminChangelistTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        self.client.force_login(self.admin)
+        self.urls = [
+            reverse('admin:posts_post_changelist'),
+            reverse('admin:posts_comment_changelist'),
+            reverse('admin:posts_follow_changelist'),
+        ]
+
+    def add_rows(self, count):
+        for number in range(count):
+            user = User.objects.create_user(
+                username=f'User{User.objects.count()}'
+            )
+            post = Post.objects.create(
+                text='Пост', author=user, group=self.group
+            )
+            Comment.objects.create(text='Текст', post=post, author=user)
+            Follow.objects.create(user=self.admin, author=user)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow(self):
+        self.add_rows(2)
+        before = {url: self.count_queries(url) for url in self.urls}
+        self.add_rows(20)
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.count_queries(url), before[url],
+                    f'Число запросов списка {url} растёт вместе с таблицей'
+                )
+
+    def test_follow_filter_is_autocomplete(self):
+        self.add_rows(3)
+        author = User.objects.get(username='User1')
+        response = self.client.get(
+            self.urls[2], {'author__id__exact': author.pk}
+        )
+        self.assertContains(
+            response, 'data-filter-parameter="user__id__exact"'
+        )
+        self.assertContains(response, 'js/autocomplete_filter.js')
+        self.assertEqual(
+            list(response.context['cl'].result_list),
+            list(Follow.objects.filter(author=author))
+        )
+        self.assertNotContains(response, 'User2</a></li>')
+        suggestions = self.client.get(
+            reverse('admin:auth_user_autocomplete'), {'term': 'User1'}
+        ).json()['results']
+        self.assertEqual(suggestions[0]['id'], str(author.pk))
+
+    def test_capped_count(self):
+        self.add_rows(5)
+        self.assertEqual(
+            SmallPaginator(Post.objects.all(), 2).count,
+            Post.objects.order_by('-pk').first().pk
+        )
+        self.assertEqual(
+            SmallPaginator(Post.objects.filter(group=self.group), 2).count,
+            SmallPaginator.COUNT_LIMIT
+        )
+        self.assertEqual(
+            SmallPaginator(Post.objects.filter(pk__lt=0), 2).count, 0
+        )
@@ -0,0 +1,176 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from .. import caching, views
+from ..models import Follow, Group, Post, User
+
+
+class FollowFeedCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.first_reader = User.objects.create_user(username='FirstReader')
+        cls.second_reader = User.objects.create_user(username='SecondReader')
+        cls.first_author = User.objects.create_user(username='FirstAuthor')
+        cls.second_author = User.objects.create_user(username='SecondAuthor')
+        Follow.objects.create(user=cls.first_reader, author=cls.first_author)
+        Follow.objects.create(
+            user=cls.second_reader, author=cls.second_author
+        )
+        cls.first_post = Post.objects.create(
+            text='Пост первого автора', author=cls.first_author
+        )
+        cls.second_post = Post.objects.create(
+            text='Пост второго автора', author=cls.second_author
+        )
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.first_client = Client()
+        self.first_client.force_login(self.first_reader)
+        self.second_client = Client()
+        self.second_client.force_login(self.second_reader)
+
+    def get_feed(self, client):
+        return client.get(reverse('posts:follow_index')).content.decode()
+
+    def test_feed_fragment_is_per_user(self):
+        self.assertIn(self.first_post.text, self.get_feed(self.first_client))
+        html = self.get_feed(self.second_client)
+        self.assertIn(self.second_post.text, html)
+        self.assertNotIn(
+            self.first_post.text,
+            html,
+            'Пользователю показана закэшированная лента другого пользователя'
+        )
+
+    def test_author_writes_invalidate_feed(self):
+        self.get_feed(self.first_client)
+        post = Post.objects.get(pk=self.first_post.pk)
+        post.text = 'Отредактированный пост'
+        post.save()
+        self.assertIn(
+            'Отредактированный пост', self.get_feed(self.first_client)
+        )
+
+        new_post = Post.objects.create(
+            text='Новый пост', author=self.first_author
+        )
+        self.assertIn(new_post.text, self.get_feed(self.first_client))
+
+        new_post.delete()
+        self.assertNotIn(new_post.text, self.get_feed(self.first_client))
+
+    @override_settings(QUERY_BUDGETS={})
+    def test_write_after_feed_read_is_not_cached_as_fresh(self):
+        get_follow_page = views.get_follow_page
+
+        def read_then_write(*args, **kwargs):
+            # Автор публикует пост сразу после того, как лента прочитана.
+            page_obj = get_follow_page(*args, **kwargs)
+            Post.objects.create(text='Пост во время рендера',
+                                author=self.first_author)
+            return page_obj
+
+        with mock.patch.object(views, 'get_follow_page', read_then_write):
+            self.assertNotIn(
+                'Пост во время рендера', self.get_feed(self.first_client)
+            )
+        self.assertIn(
+            'Пост во время рендера', self.get_feed(self.first_client),
+            'Лента со старыми постами сохранена под новой версией'
+        )
+
+    def test_follow_and_unfollow_invalidate_feed(self):
+        self.get_feed(self.first_client)
+        url_kwargs = {'username': self.second_author.username}
+        self.first_client.get(
+            reverse('posts:profile_follow', kwargs=url_kwargs)
+        )
+        self.assertIn(self.second_post.text, self.get_feed(self.first_client))
+
+        self.first_client.get(
+            reverse('posts:profile_unfollow', kwargs=url_kwargs)
+        )
+        self.assertNotIn(
+            self.second_post.text, self.get_feed(self.first_client)
+        )
+
+
+class PostsGenerationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client = Client()
+
+    def get_html(self, url):
+        return self.client.get(url).content.decode()
+
+    def test_writes_show_up_on_cached_pages(self):
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.author}),
+        ]
+        for url in urls:
+            self.get_html(url)
+
+        post = Post.objects.create(
+            text='Свежий пост', author=self.author, group=self.group
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertIn(post.text, self.get_html(url))
+
+        post.delete()
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertNotIn(post.text, self.get_html(url))
+
+    @override_settings(QUERY_BUDGETS={})
+    def test_write_after_page_read_is_not_cached_as_fresh(self):
+        self.client.force_login(self.author)
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.author}),
+        ]
+        get_page_obj = views.get_page_obj
+        for number, url in enumerate(urls):
+            text = f'Пост во время рендера {number}'
+
+            def read_then_write(*args, **kwargs):
+                # Чужая запись сразу после того, как страница прочитана.
+                page_obj = get_page_obj(*args, **kwargs)
+                Post.objects.create(
+                    text=text, author=self.author, group=self.group
+                )
+                return page_obj
+
+            with self.subTest(url=url):
+                with mock.patch.object(views, 'get_page_obj', read_then_write):
+                    self.assertNotIn(text, self.get_html(url))
+                self.assertIn(
+                    text, self.get_html(url),
+                    'Фрагмент со старыми постами сохранён под новым поколением'
+                )
+
+    def test_login_keeps_generation(self):
+        generation = caching.posts_generation()
+        self.client.force_login(self.author)
+        self.assertEqual(caching.posts_generation(), generation)
+
+        self.author.first_name = 'Иван'
+        self.author.save()
+        self.assertNotEqual(caching.posts_generation(), generation)
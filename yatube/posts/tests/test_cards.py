@@ -0,0 +1,95 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+from .. import cards
+from ..caching import bump_posts_generation
+from ..models import Group, Post, User
+
+POSTS_TOTAL = 5
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='Author', first_name='Имя', last_name='Фамилия'
+        )
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        for i in range(POSTS_TOTAL):
+            Post.objects.create(
+                text=f'Пост {i}', author=cls.author, group=cls.group,
+                image=f'posts/{i}.gif'
+            )
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.author)
+        self.url = reverse('posts:index')
+
+    def render_index(self):
+        # Сбрасывает фрагмент страницы, но не кэш карточек.
+        bump_posts_generation()
+        with mock.patch.object(
+                cards, 'render_to_string', wraps=cards.render_to_string
+        ) as render:
+            response = self.client.get(self.url)
+        return response, render.call_count
+
+    def test_cards_are_rendered_once(self):
+        response, rendered = self.render_index()
+        self.assertEqual(rendered, POSTS_TOTAL)
+        self.assertContains(response, '<article>', count=POSTS_TOTAL)
+        self.assertContains(response, '<hr>', count=POSTS_TOTAL - 1)
+        cached, rendered = self.render_index()
+        self.assertEqual(rendered, 0, 'Карточки рендерятся повторно')
+        self.assertEqual(cached.content, response.content)
+
+    def test_cached_page_skips_thumbnail_lookup(self):
+        self.render_index()
+        bump_posts_generation()
+        # Сессия, пользователь и посты; картинки не ищутся вовсе.
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+    def test_changed_post_and_author_are_rerendered(self):
+        self.render_index()
+        post = Post.objects.first()
+        post.text = 'Новый текст'
+        post.save()
+        response, rendered = self.render_index()
+        self.assertEqual(rendered, 1)
+        self.assertContains(response, 'Новый текст')
+
+        self.author.first_name = 'Другое'
+        self.author.save()
+        response, rendered = self.render_index()
+        self.assertEqual(rendered, POSTS_TOTAL)
+        self.assertContains(response, 'Другое Фамилия')
+
+    def test_page_variants(self):
+        profile_link = reverse('posts:profile', args=[self.author.username])
+        group_link = reverse('posts:group_list', args=[self.group.slug])
+        self.render_index()
+        pages = {
+            self.url: (profile_link, group_link),
+            profile_link: (group_link,),
+            group_link: (profile_link,),
+        }
+        for url, links in pages.items():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(
+                    response.content.decode().count('все записи группы'),
+                    POSTS_TOTAL if group_link in links else 0
+                )
+                self.assertEqual(
+                    response.content.decode().count('все посты пользователя'),
+                    POSTS_TOTAL if profile_link in links else 0
+                )
@@ -0,0 +1,102 @@
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+from ..models import Comment, Group, Post, User
+
+PASSWORD = 'Пароль-123'
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='Author', password=PASSWORD
+        )
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            text='Пост', author=cls.author, group=cls.group
+        )
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.guest_client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.author}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        ]
+
+    def revalidate(self, client, url, response):
+        return client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_unchanged_pages_return_304(self):
+        for client in (self.guest_client, self.author_client):
+            for url in self.urls:
+                with self.subTest(url=url, client=client):
+                    response = client.get(url)
+                    self.assertEqual(
+                        self.revalidate(client, url, response).status_code,
+                        HTTPStatus.NOT_MODIFIED,
+                        f'Страница {url} не отвечает 304 на свой ETag'
+                    )
+
+    def test_validators_differ_between_viewers(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(
+                    self.revalidate(self.author_client, url, response)
+                    .status_code,
+                    HTTPStatus.OK
+                )
+
+    def test_writes_change_validators(self):
+        responses = {url: self.author_client.get(url) for url in self.urls}
+        Comment.objects.create(
+            text='Комментарий', post=self.post, author=self.author
+        )
+        Post.objects.create(
+            text='Новый пост', author=self.author, group=self.group
+        )
+        for url, response in responses.items():
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.revalidate(self.author_client, url, response)
+                    .status_code,
+                    HTTPStatus.OK,
+                    f'Страница {url} не заметила изменений'
+                )
+
+    def test_relogin_changes_post_detail_etag(self):
+        url = self.urls[3]
+        response = self.author_client.get(url)
+        # Настоящий вход меняет cookie с токеном CSRF.
+        self.author_client.post(
+            reverse('users:login'),
+            {'username': self.author.username, 'password': PASSWORD}
+        )
+        self.assertEqual(
+            self.revalidate(self.author_client, url, response).status_code,
+            HTTPStatus.OK,
+            'После входа 304 отдал бы форму со старым токеном CSRF'
+        )
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_post_comments_last_modified(self):
+        url = reverse('posts:post_comments', kwargs={'post_id': self.post.pk})
+        response = self.author_client.get(url)
+        self.assertEqual(
+            self.author_client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            ).status_code,
+            HTTPStatus.NOT_MODIFIED
+        )
@@ -0,0 +1,95 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+from users.models import Profile
+from ..models import Comment, Follow, Post, User
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.reader = User.objects.create_user(username='Reader')
+
+    def setUp(self):
+        super().setUp()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def profile(self, user):
+        return Profile.objects.get(user=user)
+
+    def test_post_counter(self):
+        post = Post.objects.create(text='Post', author=self.author)
+        self.assertEqual(self.profile(self.author).posts_count, 1)
+        post.delete()
+        self.assertEqual(self.profile(self.author).posts_count, 0)
+
+    def test_follow_counters(self):
+        url_kwargs = {'username': self.author.username}
+        self.reader_client.get(
+            reverse('posts:profile_follow', kwargs=url_kwargs)
+        )
+        self.assertEqual(self.profile(self.author).followers_count, 1)
+        self.assertEqual(self.profile(self.reader).following_count, 1)
+
+        self.reader_client.get(
+            reverse('posts:profile_unfollow', kwargs=url_kwargs)
+        )
+        self.assertEqual(self.profile(self.author).followers_count, 0)
+        self.assertEqual(self.profile(self.reader).following_count, 0)
+
+    def test_comment_counter_survives_post_edit(self):
+        post = Post.objects.create(text='Post', author=self.author)
+        self.reader_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': post.pk}),
+            data={'text': 'Comment'}
+        )
+        post.text = 'Edited'
+        post.save()
+
+        post.refresh_from_db()
+        self.assertEqual(post.text, 'Edited')
+        self.assertEqual(
+            post.comments_count,
+            1,
+            'Сохранение поста перезаписало счётчик комментариев'
+        )
+
+    def test_profile_page_reads_counter(self):
+        Post.objects.create(text='Post', author=self.author)
+        response = self.reader_client.get(
+            reverse('posts:profile', kwargs={'username': self.author})
+        )
+        self.assertContains(response, 'Всего постов: 1')
+
+    def test_reconcile_counters(self):
+        post = Post.objects.create(text='Post', author=self.author)
+        Comment.objects.create(text='Comment', post=post, author=self.reader)
+        Follow.objects.create(user=self.reader, author=self.author)
+        Profile.objects.update(
+            posts_count=7, followers_count=7, following_count=7
+        )
+        Post.objects.update(comments_count=7)
+
+        call_command('reconcile_counters', batch_size=1, stdout=StringIO())
+
+        author = self.profile(self.author)
+        reader = self.profile(self.reader)
+        self.assertEqual(
+            (author.posts_count, author.followers_count,
+             author.following_count),
+            (1, 1, 0)
+        )
+        self.assertEqual(
+            (reader.posts_count, reader.followers_count,
+             reader.following_count),
+            (0, 0, 1)
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
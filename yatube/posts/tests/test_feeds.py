@@ -0,0 +1,199 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from core import jobs
+from core.models import Job
+from ..feeds import is_pulled
+from ..models import Follow, Post, TimelineEntry, User
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.author = User.objects.create_user(username='Author')
+        cls.old_post = Post.objects.create(text='Old post', author=cls.author)
+
+    def setUp(self):
+        super().setUp()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def timeline_posts(self):
+        return [
+            entry.post for entry in self.reader.timeline.select_related('post')
+        ]
+
+    def follow(self):
+        self.reader_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': self.author.username}
+        ))
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        self.follow()
+        self.assertEqual(
+            self.timeline_posts(),
+            [self.old_post],
+            'После подписки лента не заполнилась старыми постами автора'
+        )
+
+        self.reader_client.get(reverse(
+            'posts:profile_unfollow',
+            kwargs={'username': self.author.username}
+        ))
+        self.assertEqual(
+            self.timeline_posts(),
+            [],
+            'После отписки посты автора остались в ленте'
+        )
+
+    def test_post_create_fans_out(self):
+        self.follow()
+        self.author_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Fresh post'}
+        )
+        new_post = Post.objects.get(text='Fresh post')
+        self.assertEqual(self.timeline_posts(), [new_post, self.old_post])
+
+        page_obj = self.reader_client.get(
+            reverse('posts:follow_index')
+        ).context['page_obj']
+        self.assertEqual(list(page_obj), [new_post, self.old_post])
+
+    def test_rebuild_command(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        TimelineEntry.objects.all().delete()
+
+        call_command('rebuild_timelines', stdout=StringIO())
+        self.assertEqual(self.timeline_posts(), [self.old_post])
+
+
+@override_settings(FEED_PULL_THRESHOLD=2)
+class HybridFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.fan = User.objects.create_user(username='Fan')
+        cls.star = User.objects.create_user(username='Star')
+        cls.author = User.objects.create_user(username='Author')
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_star_posts_are_pulled_and_merged(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.reader, author=self.star)
+        Follow.objects.create(user=self.fan, author=self.star)
+        posts = [
+            Post.objects.create(text=f'Post {i}', author=author)
+            for i, author in enumerate([self.star, self.author] * 8)
+        ]
+
+        self.assertFalse(
+            TimelineEntry.objects.filter(author=self.star).exists(),
+            'Посты автора выше порога не должны раскладываться по лентам'
+        )
+        expected = sorted(
+            posts, key=lambda post: (post.pub_date, post.pk), reverse=True
+        )
+        page_obj = self.client.get(
+            reverse('posts:follow_index')
+        ).context['page_obj']
+        next_page = self.client.get(
+            reverse('posts:follow_index') + f'?cursor={page_obj.next_cursor}'
+        ).context['page_obj']
+        self.assertEqual(
+            list(page_obj) + list(next_page),
+            expected,
+            'Лента подписок неверно сливает материализованные и '
+            'подтягиваемые посты'
+        )
+
+
+@override_settings(FEED_PULL_THRESHOLD=4, FEED_RESUME_RATIO=0.9)
+class PullThresholdTests(TestCase):
+    """Порог 4, обратно к раскладыванию — ниже 3 подписчиков."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.reader, cls.late, *cls.fans = [
+            User.objects.create_user(username=name)
+            for name in ('Reader', 'Late', 'Fan1', 'Fan2', 'Fan3')
+        ]
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def timeline_posts(self, user):
+        return [
+            entry.post for entry in user.timeline.select_related('post')
+        ]
+
+    def feed(self):
+        return list(
+            self.client.get(reverse('posts:follow_index')).context['page_obj']
+        )
+
+    def resume_jobs(self):
+        return Job.objects.filter(key=f'resume_push:{self.author.pk}')
+
+    def test_crossing_threshold_both_ways(self):
+        old_post = Post.objects.create(text='Old post', author=self.author)
+        for user in (self.reader, *self.fans):
+            Follow.objects.create(user=user, author=self.author)
+        self.assertTrue(is_pulled(self.author.pk))
+        pulled_post = Post.objects.create(
+            text='Pulled post', author=self.author
+        )
+        Follow.objects.create(user=self.late, author=self.author)
+        self.assertEqual(self.timeline_posts(self.reader), [old_post])
+        self.assertEqual(self.timeline_posts(self.late), [])
+        self.assertEqual(
+            self.feed(), [pulled_post, old_post],
+            'Выше порога посты автора должны подтягиваться при чтении'
+        )
+
+        Follow.objects.filter(user__in=self.fans[:2]).delete()
+        self.assertFalse(
+            self.resume_jobs().exists(),
+            'У самой границы автор не должен возвращаться к раскладыванию'
+        )
+        Follow.objects.get(user=self.fans[2]).delete()
+        self.assertEqual(self.resume_jobs().count(), 1)
+        self.assertEqual(
+            self.timeline_posts(self.late), [],
+            'Отписка не должна дозаполнять ленты сама'
+        )
+        self.assertEqual(self.feed(), [pulled_post, old_post])
+
+        jobs.work(once=True)
+        self.assertFalse(is_pulled(self.author.pk))
+        for user in (self.reader, self.late):
+            with self.subTest(user=user.username):
+                self.assertEqual(
+                    self.timeline_posts(user), [pulled_post, old_post],
+                    'Ниже порога лента не получила посты времён подтягивания'
+                )
+        self.assertEqual(
+            TimelineEntry.objects.filter(author=self.author).count(), 4,
+            'Отписавшиеся не должны получать посты автора'
+        )
+
+        new_post = Post.objects.create(text='New post', author=self.author)
+        self.assertEqual(
+            self.feed(), [new_post, pulled_post, old_post],
+            'Ниже порога новые посты снова раскладываются по лентам'
+        )
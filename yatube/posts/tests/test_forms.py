@@ -1,3 +1,4 @@
+import hashlib
 import tempfile
 import shutil
 
@@ -22,7 +23,7 @@ class PostsFormsTests(TestCase):
             description='Testing Group'
         )
 
-        image = (
+        cls.upload_content = image = (
             b'\x47\x49\x46\x38\x39\x61\x02\x00'
             b'\x01\x00\x80\x00\x00\x00\x00\x00'
             b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
@@ -69,9 +70,11 @@ class PostsFormsTests(TestCase):
         created_post = Post.objects.first()
         self.assertEqual(created_post.text, payload['text'])
         self.assertEqual(created_post.group.pk, payload['group'])
+        # Картинки хранятся под именем по sha256 содержимого.
+        digest = hashlib.sha256(self.upload_content).hexdigest()
         self.assertEqual(
             str(created_post.image),
-            f'posts/{payload["image"]}'
+            f'posts/{digest[:2]}/{digest}.gif'
         )
 
     def test_edit_post(self):
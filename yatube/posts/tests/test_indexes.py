@@ -0,0 +1,74 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from ..models import Comment, Follow, Group, Post, TimelineEntry, User
+from ..paginators import COMMENT_KEYS, CursorPaginator
+from ..feeds import TIMELINE_KEYS
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN из SQLite')
+class FeedIndexTests(TestCase):
+    """Ленты читаются по индексу, без сортировки во временном B-дереве."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='User')
+        cls.author = User.objects.create_user(username='Author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+        for number in range(3):
+            Post.objects.create(
+                text=f'Пост {number}', author=cls.author, group=cls.group
+            )
+        cls.post = Post.objects.first()
+        Comment.objects.create(text='Текст', post=cls.post, author=cls.user)
+
+    def plans(self, queryset, keys=('pub_date', 'pk')):
+        """Планы SELECT первой и следующей курсорной страницы."""
+        paginator = CursorPaginator(queryset, 1, keys)
+        with CaptureQueriesContext(connection) as queries:
+            paginator.get_page(paginator.get_page().next_cursor)
+        with connection.cursor() as cursor:
+            for query in queries:
+                cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+                yield query['sql'], ' '.join(
+                    row[-1] for row in cursor.fetchall()
+                )
+
+    def test_feed_queries(self):
+        post_keys = ('pub_date', 'pk')
+        feeds = {
+            'post_feed_idx': (Post.objects.feed(), post_keys),
+            'post_group_feed_idx': (self.group.posts.feed(), post_keys),
+            'post_author_feed_idx': (self.author.posts.feed(), post_keys),
+            'comment_post_feed_idx': (
+                self.post.comments.all(), COMMENT_KEYS
+            ),
+            'timeline_user_feed_idx': (
+                TimelineEntry.objects.filter(user=self.user).feed(),
+                TIMELINE_KEYS
+            ),
+        }
+        for index, (queryset, keys) in feeds.items():
+            for sql, plan in self.plans(queryset, keys):
+                with self.subTest(index=index, plan=plan):
+                    self.assertIn(
+                        index, plan, f'Запрос не использует {index}: {sql}'
+                    )
+                    self.assertNotIn(
+                        'TEMP B-TREE', plan,
+                        f'Запрос сортирует результат: {sql}'
+                    )
+
+    def test_follow_lookup(self):
+        follows = Follow.objects.filter(user=self.user, author=self.author)
+        sql, params = follows.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        self.assertIn('posts_follow_user_id_author_id', plan)
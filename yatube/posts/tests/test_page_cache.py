@@ -0,0 +1,89 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from .. import views
+from ..models import Comment, Group, Post, User
+
+
+class AnonymousPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            text='Пост', author=cls.author, group=cls.group
+        )
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.guest_client = Client()
+        self.urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.author}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        ]
+
+    def get_html(self, url):
+        return self.guest_client.get(url).content.decode()
+
+    def test_hit_does_not_touch_database(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                first = self.guest_client.get(url)
+                self.assertIn(f'post:{self.post.pk}', first['Surrogate-Key'])
+                with self.assertNumQueries(0):
+                    second = self.guest_client.get(url)
+                self.assertEqual(first.content, second.content)
+
+    def test_logged_in_user_is_not_served_cached_page(self):
+        self.get_html(self.urls[0])
+        client = Client()
+        client.force_login(self.author)
+        self.assertIsNotNone(client.get(self.urls[0]).context)
+
+    def test_writes_purge_tagged_pages(self):
+        for url in self.urls:
+            self.get_html(url)
+
+        Comment.objects.create(
+            text='Новый комментарий', post=self.post, author=self.author
+        )
+        self.assertIn('Новый комментарий', self.get_html(self.urls[3]))
+
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        group.save()
+        self.assertIn('Новое название', self.get_html(self.urls[1]))
+        self.assertIn('Новое название', self.get_html(self.urls[3]))
+
+        author = User.objects.get(pk=self.author.pk)
+        author.first_name = 'Лев'
+        author.save()
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertIn('Лев', self.get_html(url))
+
+    @override_settings(QUERY_BUDGETS={})
+    def test_write_during_render_is_not_cached(self):
+        url = self.urls[0]
+        render = views.render
+
+        def render_then_write(*args, **kwargs):
+            # Запись другого запроса, пока этот собирает страницу.
+            response = render(*args, **kwargs)
+            Post.objects.create(text='Свежий пост', author=self.author)
+            return response
+
+        with mock.patch.object(views, 'render', render_then_write):
+            self.assertNotIn('Свежий пост', self.get_html(url))
+        self.assertIn(
+            'Свежий пост', self.get_html(url),
+            'Страница, отрендеренная до записи, сохранена как актуальная'
+        )
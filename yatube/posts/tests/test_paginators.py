@@ -0,0 +1,170 @@
+from core.templatetags.pagination import elided_page_range
+from django.core.paginator import Paginator
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from ..models import Comment, Post, User
+from ..paginators import CursorPaginator, decode_cursor, FORWARD
+from ..views import COMMENTS_QUANTITY
+
+POSTS_TOTAL = 25
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        Post.objects.bulk_create([
+            Post(text=f'Post {i}', author=cls.user)
+            for i in range(POSTS_TOTAL)
+        ])
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+
+    def get_page(self, cursor=None):
+        return CursorPaginator(Post.objects.all(), 10).get_page(cursor)
+
+    def test_walk_forward_and_back(self):
+        expected = list(Post.objects.order_by('-pub_date', '-pk'))
+        pages = [self.get_page()]
+        while pages[-1].has_next():
+            pages.append(self.get_page(pages[-1].next_cursor))
+
+        self.assertEqual(
+            [post for page in pages for post in page],
+            expected,
+            'Курсорная пагинация теряет или дублирует посты'
+        )
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertFalse(pages[0].has_previous())
+
+        previous = self.get_page(pages[-1].previous_cursor)
+        self.assertEqual(list(previous), list(pages[1]))
+        self.assertTrue(previous.has_next())
+
+    def test_last_cursor(self):
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        page = paginator.get_page(paginator.last_cursor)
+        self.assertEqual(
+            list(page),
+            list(Post.objects.order_by('-pub_date', '-pk'))[-10:]
+        )
+        self.assertFalse(page.has_next())
+        self.assertTrue(page.has_previous())
+
+    def test_broken_cursor_is_first_page(self):
+        for cursor in ('', 'garbage', '!!!'):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(decode_cursor(cursor), (FORWARD, None))
+
+    def test_deep_page_has_no_count_and_offset(self):
+        page = self.get_page()
+        page = self.get_page(page.next_cursor)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(
+                reverse('posts:index') + f'?cursor={page.next_cursor}'
+            )
+        for query in queries.captured_queries:
+            with self.subTest(sql=query['sql']):
+                self.assertNotIn('COUNT(', query['sql'])
+                self.assertNotIn('OFFSET', query['sql'])
+
+    def test_legacy_page_links(self):
+        page_obj = self.client.get(
+            reverse('posts:index') + '?page=3'
+        ).context['page_obj']
+        self.assertEqual(page_obj.number, 3)
+        self.assertEqual(len(page_obj), 5)
+
+
+class CommentsPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.post = Post.objects.create(text='Пост', author=cls.user)
+        Comment.objects.bulk_create([
+            Comment(text=f'Comment {i}', post=cls.post, author=cls.user)
+            for i in range(COMMENTS_QUANTITY + 5)
+        ])
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+
+    def test_first_page_inline_and_load_more(self):
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
+        comments = response.context['comments']
+        self.assertEqual(
+            len(comments), COMMENTS_QUANTITY,
+            'На странице поста выводятся все комментарии сразу'
+        )
+        self.assertTrue(comments.has_next())
+
+        more = self.client.get(
+            reverse('posts:post_comments', kwargs={'post_id': self.post.pk}),
+            {'cursor': comments.next_cursor}
+        )
+        self.assertTemplateUsed(more, 'includes/comments_list.html')
+        self.assertEqual(len(more.context['comments']), 5)
+        self.assertFalse(more.context['comments'].has_next())
+        loaded = list(comments) + list(more.context['comments'])
+        self.assertEqual(
+            [comment.pk for comment in loaded],
+            list(
+                self.post.comments.order_by('-created', '-pk')
+                .values_list('pk', flat=True)
+            ),
+            'Подгрузка комментариев теряет или дублирует записи'
+        )
+
+    def test_missing_post_comments_404(self):
+        response = self.client.get(
+            reverse('posts:post_comments', kwargs={'post_id': 0})
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class PaginatorTemplateTests(TestCase):
+    MAX_HTML_SIZE = 4096
+
+    def setUp(self):
+        super().setUp()
+        self.paginator = Paginator(range(500_000), 10)
+
+    def test_elided_page_range(self):
+        cases = {
+            1: [1, 2, 3, 4, None, 49999, 50000],
+            25_000: [
+                1, 2, None, 24997, 24998, 24999, 25000, 25001, 25002,
+                25003, None, 49999, 50000
+            ],
+            50_000: [1, 2, None, 49997, 49998, 49999, 50000],
+        }
+        for number, expected in cases.items():
+            with self.subTest(number=number):
+                self.assertEqual(
+                    elided_page_range(self.paginator.page(number)),
+                    expected
+                )
+        short = Paginator(range(30), 10)
+        self.assertEqual(elided_page_range(short.page(2)), [1, 2, 3])
+
+    def test_paginator_html_size_is_capped(self):
+        html = render_to_string(
+            'includes/paginator.html',
+            {'page_obj': self.paginator.page(25_000)}
+        )
+        self.assertIn('?page=50000', html)
+        self.assertLess(
+            len(html.encode()),
+            PaginatorTemplateTests.MAX_HTML_SIZE,
+            'Пагинатор выводит ссылки на все страницы'
+        )
@@ -0,0 +1,78 @@
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+from ..models import Comment, Follow, Group, Post, User
+
+POSTS_TOTAL = 15
+
+
+class FeedQueryCountTests(TestCase):
+    """Число запросов страницы не зависит от числа постов на ней."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.authors = [
+            User.objects.create_user(
+                username=f'Author{i}', first_name='Имя', last_name=f'{i}'
+            )
+            for i in range(3)
+        ]
+        cls.groups = [
+            Group.objects.create(
+                title=f'Группа {i}', slug=f'group-{i}', description='Описание'
+            )
+            for i in range(2)
+        ]
+        for author in cls.authors:
+            Follow.objects.create(user=cls.reader, author=author)
+        for i in range(POSTS_TOTAL):
+            Post.objects.create(
+                text=f'Пост {i}',
+                author=cls.authors[i % len(cls.authors)],
+                group=cls.groups[i % len(cls.groups)]
+            )
+        cls.post = Post.objects.filter(group=cls.groups[0]).first()
+        for author in cls.authors:
+            Comment.objects.create(
+                text='Комментарий', post=cls.post, author=author
+            )
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.guest_client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_public_pages(self):
+        pages = {
+            reverse('posts:index'): 1,
+            reverse('posts:index') + '?page=2': 2,
+            reverse(
+                'posts:group_list', kwargs={'slug': self.groups[0].slug}
+            ): 2,
+            reverse(
+                'posts:profile', kwargs={'username': self.authors[0]}
+            ): 3,
+            reverse(
+                'posts:post_detail', kwargs={'post_id': self.post.pk}
+            ): 3,
+        }
+        for url, queries in pages.items():
+            with self.subTest(url=url):
+                cache.clear()
+                with self.assertNumQueries(queries):
+                    self.guest_client.get(url)
+
+    def test_follow_index(self):
+        pages = {
+            reverse('posts:follow_index'): 4,
+            reverse('posts:follow_index') + '?page=2': 5,
+        }
+        for url, queries in pages.items():
+            with self.subTest(url=url):
+                cache.clear()
+                with self.assertNumQueries(queries):
+                    self.reader_client.get(url)
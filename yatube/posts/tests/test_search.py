@@ -0,0 +1,112 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from .. import search as search_module
+from ..models import Post, User
+from ..search import build_query, search
+from ..views import POSTS_QUANTITY
+
+MATCHES_TOTAL = 25
+
+
+class PostSearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='User')
+        cls.best = Post.objects.create(
+            text='Котики, котики и ещё раз котики', author=cls.user
+        )
+        Post.objects.bulk_create([
+            Post(text=f'Пост {number} про котика', author=cls.user)
+            for number in range(MATCHES_TOTAL - 1)
+        ])
+        cls.other = Post.objects.create(text='Про собак', author=cls.user)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client = Client()
+
+    def walk(self, text):
+        pages = [search(text, None, POSTS_QUANTITY)]
+        while pages[-1].has_next():
+            pages.append(search(text, pages[-1].next_cursor, POSTS_QUANTITY))
+        return [post for page in pages for post in page]
+
+    def test_ranked_prefix_search(self):
+        posts = self.walk('КОТ')
+        self.assertEqual(posts[0], self.best, 'Результаты не ранжированы')
+        self.assertEqual(
+            len(set(posts)), MATCHES_TOTAL,
+            'Курсор теряет или дублирует результаты поиска'
+        )
+        self.assertNotIn(self.other, posts)
+
+    def test_frequent_word_is_truncated(self):
+        with mock.patch.object(search_module, 'MAX_RANKED', MATCHES_TOTAL):
+            self.assertEqual(len(self.walk('котик')), MATCHES_TOTAL)
+            self.assertFalse(search('котик', None, POSTS_QUANTITY).truncated)
+        with mock.patch.object(search_module, 'MAX_RANKED', 10):
+            self.assertEqual(len(self.walk('котик')), 10)
+            self.assertTrue(search('котик', None, POSTS_QUANTITY).truncated)
+            response = self.client.get(
+                reverse('posts:search'), {'q': 'котик'}
+            )
+        self.assertContains(response, 'Уточните запрос')
+
+    def test_user_input_is_escaped(self):
+        self.assertEqual(
+            build_query('AND ( "кот" NOT:'), '"AND"* "кот"* "NOT"*'
+        )
+        self.assertEqual(build_query('!!!'), '')
+
+    def test_index_follows_writes(self):
+        post = Post.objects.get(pk=self.other.pk)
+        post.text = 'Теперь про попугаев'
+        post.save()
+        self.assertEqual(list(search('попуга', None, 10)), [post])
+        self.assertEqual(list(search('собак', None, 10)), [])
+        post.delete()
+        self.assertEqual(list(search('попуга', None, 10)), [])
+
+    def test_search_page(self):
+        response = self.client.get(reverse('posts:search'), {'q': 'котик'})
+        page_obj = response.context['page_obj']
+        self.assertEqual(len(page_obj), POSTS_QUANTITY)
+        self.assertContains(response, 'q=%D0%BA%D0%BE%D1%82%D0%B8%D0%BA')
+        self.assertNotContains(response, 'Уточните запрос')
+        self.assertIsNone(
+            self.client.get(reverse('posts:search')).context['page_obj']
+        )
+
+    def test_query_without_words(self):
+        for query in ('!!!', '—'):
+            with self.subTest(query=query):
+                response = self.client.get(
+                    reverse('posts:search'), {'q': query}
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertIsNone(response.context['page_obj'])
+                self.assertContains(response, 'ничего не найдено')
+
+    def test_admin_search_uses_index(self):
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        self.client.force_login(admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('admin:posts_post_changelist'), {'q': 'собак'}
+            )
+        self.assertEqual(
+            list(response.context['cl'].result_list), [self.other]
+        )
+        self.assertFalse(
+            any('LIKE' in query['sql'] for query in queries),
+            'Поиск в админке идёт через LIKE'
+        )
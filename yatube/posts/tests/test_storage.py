@@ -0,0 +1,127 @@
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from ..models import Post, User
+from .. import storage
+from ..storage import GRACE_PERIOD, collect_garbage
+from ..thumbnails import generate, lookup
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ContentAddressedStorageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def create(self, name='image.gif', content=SMALL_GIF):
+        return Post.objects.create(
+            text='Пост', author=self.author,
+            image=SimpleUploadedFile(name, content, content_type='image/gif')
+        )
+
+    def age(self, post):
+        # Сборщик не трогает свежие файлы.
+        old = time.time() - GRACE_PERIOD.total_seconds() * 2
+        os.utime(post.image.path, (old, old))
+
+    def test_same_content_is_stored_once(self):
+        first = self.create('meme.gif')
+        files = os.listdir(os.path.dirname(first.image.path))
+        second = self.create('other-name.GIF')
+        other = self.create('meme.gif', SMALL_GIF + b'\x00')
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertNotEqual(first.image.name, other.image.name)
+        self.assertTrue(first.image.name.startswith('posts/'))
+        self.assertEqual(
+            os.listdir(os.path.dirname(first.image.path)), files,
+            'Копия сохранена отдельным файлом'
+        )
+
+    def test_duplicate_reuses_thumbnails(self):
+        first = self.create()
+        generate(first.image.name)
+        second = self.create()
+        self.assertEqual(
+            lookup(first.image, 'card').name,
+            lookup(second.image, 'card').name
+        )
+
+    def test_cleanup_deletes_only_unreferenced_files(self):
+        kept = self.create()
+        shared = self.create()
+        orphan = self.create('orphan.gif', SMALL_GIF + b'\x01')
+        fresh = self.create('fresh.gif', SMALL_GIF + b'\x02')
+        generate(orphan.image.name)
+        thumbnail = lookup(orphan.image, 'card')
+        for post in (kept, orphan):
+            self.age(post)
+        orphan_path = orphan.image.path
+        shared.delete()
+        orphan.delete()
+        fresh.delete()
+
+        output = StringIO()
+        call_command('cleanup_images', dry_run=True, stdout=output)
+        self.assertIn('файлов: 1', output.getvalue())
+        self.assertTrue(os.path.exists(orphan_path))
+
+        call_command('cleanup_images', stdout=StringIO())
+        self.assertFalse(os.path.exists(orphan_path))
+        self.assertFalse(thumbnail.exists(), 'Миниатюры не удалены')
+        self.assertTrue(os.path.exists(kept.image.path))
+        self.assertTrue(
+            os.path.exists(fresh.image.path), 'Удалён свежий файл'
+        )
+
+    def test_cleanup_keeps_reused_old_file(self):
+        orphan = self.create()
+        self.age(orphan)
+        orphan.delete()
+        # Повторная загрузка того же файла, пост ещё не сохранён.
+        name = Post._meta.get_field('image').storage.save(
+            'posts/again.gif', ContentFile(SMALL_GIF)
+        )
+        self.assertEqual(name, orphan.image.name)
+        self.assertEqual(collect_garbage(), (0, 0))
+        self.assertTrue(os.path.exists(orphan.image.path))
+
+    def test_cleanup_rechecks_posts_before_delete(self):
+        orphan = self.create()
+        self.age(orphan)
+        orphan.delete()
+        stored_files = storage.stored_files
+
+        def files_with_new_post(*args):
+            # Пост с картинкой сохраняется, пока сборщик обходит файлы;
+            # файл снова старый, спасти его может только перепроверка.
+            self.age(self.create())
+            yield from stored_files(*args)
+
+        with mock.patch.object(storage, 'stored_files', files_with_new_post):
+            self.assertEqual(collect_garbage(), (0, 0))
+        self.assertTrue(os.path.exists(orphan.image.path))
@@ -0,0 +1,99 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase, override_settings
+from users.models import Profile
+from .. import benchmark, synthetic
+from ..models import Follow, Post, TimelineEntry, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class SyntheticDataTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.created = synthetic.generate(
+            users=20, groups=3, posts=100, comments=200, follows=5,
+            images=2, seed=1, batch_size=30
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_dataset_is_consistent(self):
+        self.assertEqual(self.created['users'], 20)
+        self.assertEqual(self.created['posts'], 100)
+        self.assertEqual(self.created['comments'], 200)
+        self.assertFalse(
+            Follow.objects.filter(user=F('author')).exists(),
+            'Сгенерирована подписка на самого себя'
+        )
+        self.assertNotEqual(
+            Post.objects.order_by('pub_date').first().pub_date,
+            Post.objects.order_by('pub_date').last().pub_date,
+            'Даты публикаций не распределены во времени'
+        )
+        self.assertTrue(Post.objects.exclude(image='').exists())
+        for profile in Profile.objects.select_related('user'):
+            with self.subTest(user=profile.user.username):
+                self.assertEqual(
+                    profile.posts_count, profile.user.posts.count()
+                )
+                self.assertEqual(
+                    profile.followers_count, profile.user.following.count()
+                )
+        self.assertEqual(
+            TimelineEntry.objects.count(),
+            Post.objects.filter(author__following__isnull=False).count(),
+            'Ленты подписок не соответствуют подпискам'
+        )
+
+    def test_same_seed_can_run_again(self):
+        created = synthetic.generate(
+            users=5, groups=1, posts=10, comments=5, follows=2, seed=1
+        )
+        self.assertEqual(created['users'], 5)
+        self.assertEqual(User.objects.count(), 25)
+
+    def test_benchmark_report(self):
+        report = benchmark.run(repeat=2)
+        self.assertEqual(report['dataset']['post'], 100)
+        for name, metrics in report['views'].items():
+            with self.subTest(view=name):
+                self.assertIn(metrics['status'], (200, 302))
+                self.assertLessEqual(metrics['p50_ms'], metrics['p99_ms'])
+                self.assertGreaterEqual(metrics['queries'], 0)
+        self.assertIn('posts:follow_index', report['views'])
+        self.assertIn('posts:search[heavy]', report['views'])
+
+
+class ConcurrencyBenchmarkTests(TransactionTestCase):
+    def test_stress_report(self):
+        author = User.objects.create_user(username='Author')
+        post = Post.objects.create(
+            text=benchmark.BENCHMARK_TEXT, author=author
+        )
+        for pragmas in (benchmark.BASELINE_PRAGMAS, settings.SQLITE_PRAGMAS):
+            with self.subTest(journal_mode=pragmas['journal_mode']):
+                report = benchmark.stress(
+                    threads=2, seconds=0.2, write_ratio=0.5, pragmas=pragmas
+                )
+                self.assertGreater(report['reads'] + report['writes'], 0)
+                self.assertIn('write_p95_ms', report)
+                self.assertEqual(
+                    report['journal_mode'], pragmas['journal_mode'].lower()
+                )
+        self.assertEqual(
+            list(Post.objects.values_list('pk', flat=True)), [post.pk],
+            'Нагрузка изменила посты живой базы'
+        )
+        self.assertEqual(
+            Profile.objects.get(user=author).posts_count, 1,
+            'Сигналы нагрузки изменили счётчики живой базы'
+        )
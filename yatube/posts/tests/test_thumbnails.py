@@ -0,0 +1,176 @@
+import json
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from sorl.thumbnail.images import serialize_image_file
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.models import KVStore as KVStoreModel
+from core.models import Job
+from ..models import Post, User
+from .. import thumbnails
+from ..thumbnails import lookup
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailPipelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def upload(self, name='image.gif'):
+        return SimpleUploadedFile(name, SMALL_GIF, content_type='image/gif')
+
+    def test_upload_is_processed_by_worker(self):
+        self.client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Пост с картинкой', 'image': self.upload()}
+        )
+        post = Post.objects.get(text='Пост с картинкой')
+        self.assertEqual(Job.objects.count(), 1)
+        self.assertIsNone(
+            lookup(post.image, 'card'),
+            'Миниатюра генерируется прямо в запросе'
+        )
+        url = reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        self.assertContains(self.client.get(url), post.image.url)
+        self.assertContains(
+            Client().get(reverse('posts:index')), 'object-fit'
+        )
+
+        call_command(
+            'run_jobs', once=True, stdout=StringIO(), stderr=StringIO()
+        )
+        self.assertFalse(Job.objects.exists())
+        thumbnail = lookup(post.image, 'card')
+        self.assertIsNotNone(thumbnail, 'Воркер не создал миниатюру')
+        self.assertEqual(list(thumbnail.size), [960, 339])
+        self.assertContains(
+            Client().get(reverse('posts:index')), thumbnail.url
+        )
+        response = self.client.get(url)
+        self.assertContains(response, thumbnail.url)
+        self.assertContains(response, 'type="image/webp"')
+        for width in settings.POST_THUMBNAIL_WIDTHS:
+            self.assertContains(response, f' {width}w', count=2)
+        self.assertContains(response, 'width="960" height="339"')
+        self.assertNotContains(response, 'object-fit')
+
+    def test_variants(self):
+        variants = thumbnails.variants('card')
+        self.assertEqual(
+            [(variant.width, variant.format) for variant in variants],
+            [(320, 'WEBP'), (320, None), (640, 'WEBP'), (640, None),
+             (960, 'WEBP'), (960, None)]
+        )
+        self.assertEqual(variants[0].geometry, '320x113')
+
+    def test_savings_report(self):
+        post = Post.objects.create(
+            text='Пост', author=self.author, image=self.upload()
+        )
+        thumbnails.generate(post.image.name)
+        output = StringIO()
+        call_command('thumbnail_savings', stdout=output)
+        report = json.loads(output.getvalue())
+        self.assertEqual(report['images'], 1)
+        self.assertEqual(report['original_bytes'], len(SMALL_GIF))
+        row = report['variants']['card 320w webp']
+        self.assertEqual(row['images'], 1)
+        self.assertEqual(row['original_bytes'], len(SMALL_GIF))
+        self.assertGreater(row['bytes'], 0)
+
+    def test_edit_without_new_image_does_not_enqueue(self):
+        post = Post.objects.create(
+            text='Пост', author=self.author, image=self.upload('old.gif')
+        )
+        self.client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            data={'text': 'Новый текст'}
+        )
+        self.assertFalse(Job.objects.exists())
+        self.client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            data={'text': 'Новый текст', 'image': self.upload('new.gif')}
+        )
+        self.assertEqual(Job.objects.count(), 1)
+
+
+class BatchedLookupTests(TestCase):
+    """Картинки страницы ищутся одним get_many и одним запросом к базе."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        author = User.objects.create_user(username='Author')
+        Post.objects.bulk_create([
+            Post(text=f'Пост {i}', author=author, image=f'posts/{i}.gif')
+            for i in range(12)
+        ])
+        cls.post = Post.objects.first()
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_feed_page_costs_one_query_for_images(self):
+        with self.assertNumQueries(2):
+            self.client.get(reverse('posts:index'))
+
+    def test_post_detail_costs_one_query_for_image(self):
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        with self.assertNumQueries(4):
+            self.client.get(url)
+
+    def test_misses_are_cached(self):
+        posts = list(Post.objects.all())
+        with self.assertNumQueries(1):
+            thumbnails.prefetch_pictures(posts)
+        with self.assertNumQueries(0):
+            thumbnails.prefetch_pictures(posts)
+        self.assertTrue(
+            all(post.pictures['card']['pending'] for post in posts)
+        )
+
+    @override_settings(THUMBNAIL_MISS_TIMEOUT=0)
+    def test_misses_expire(self):
+        image = self.post.image
+        self.assertIsNone(lookup(image, 'card'))
+        self.assertTrue(thumbnails.picture(image, 'card')['pending'])
+        # Воркер в другом процессе пишет в базу мимо кэша этого процесса.
+        for variant in thumbnails.variants('card'):
+            file = thumbnails.variant_file(image, variant)
+            file.set_size((variant.width, variant.height))
+            KVStoreModel.objects.create(
+                key=add_prefix(file.key), value=serialize_image_file(file)
+            )
+        self.assertIsNotNone(lookup(image, 'card'))
+        self.assertFalse(thumbnails.picture(image, 'card')['pending'])
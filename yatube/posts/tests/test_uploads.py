@@ -0,0 +1,93 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from PIL import Image
+from ..models import Post, User
+from ..uploads import ORIENTATION_TAG
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def make_image(size=(40, 20), image_format='PNG', exif=None):
+    file = BytesIO()
+    options = {'exif': exif} if exif is not None else {}
+    Image.new('RGB', size, 'red').save(file, image_format, **options)
+    return file.getvalue()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImageUploadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def create(self, content, name='image.png'):
+        return self.client.post(reverse('posts:post_create'), data={
+            'text': 'Пост с картинкой',
+            'image': SimpleUploadedFile(name, content)
+        })
+
+    def assertRejected(self, response, code):
+        self.assertEqual(response.status_code, 200)
+        form = response.context['form']
+        self.assertTrue(form.has_error('image', code), form.errors)
+        self.assertEqual(form['text'].value(), 'Пост с картинкой')
+        self.assertFalse(Post.objects.exists())
+
+    def test_valid_image_is_saved(self):
+        response = self.create(make_image())
+        self.assertEqual(response.status_code, 302)
+        post = Post.objects.get()
+        self.assertEqual(Image.open(post.image).size, (40, 20))
+
+    @override_settings(POST_IMAGE_MAX_BYTES=1024)
+    def test_too_many_bytes(self):
+        self.assertRejected(
+            self.create(make_image((500, 500), 'BMP'), 'image.bmp'),
+            'image_bytes'
+        )
+
+    @override_settings(POST_IMAGE_MAX_PIXELS=100)
+    def test_too_many_pixels(self):
+        self.assertRejected(self.create(make_image()), 'image_pixels')
+
+    def test_unsupported_format(self):
+        self.assertRejected(
+            self.create(make_image(image_format='BMP'), 'image.bmp'),
+            'image_format'
+        )
+
+    def test_not_an_image(self):
+        self.assertRejected(
+            self.create(b'not an image' * 10, 'image.png'), 'invalid_image'
+        )
+
+    def test_exif_is_stripped_and_orientation_applied(self):
+        exif = Image.Exif()
+        exif[ORIENTATION_TAG] = 6
+        exif[0x010F] = 'Camera'
+        response = self.create(
+            make_image(image_format='JPEG', exif=exif.tobytes()), 'image.jpg'
+        )
+        self.assertEqual(response.status_code, 302)
+        image = Image.open(Post.objects.get().image)
+        self.assertEqual(image.size, (20, 40), 'Ориентация не применена')
+        self.assertFalse(image.getexif(), 'EXIF не удалён')
@@ -0,0 +1,302 @@
+from collections import namedtuple
+
+from django.conf import settings
+from PIL import Image
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.engines import pil_engine
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores import cached_db_kvstore
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.models import KVStore as KVStoreModel
+
+from core.jobs import enqueue
+from .models import Post
+
+GENERATE_JOB = 'posts.thumbnails.generate'
+MIME_TYPES = {'JPEG': 'image/jpeg', 'PNG': 'image/png', 'GIF': 'image/gif',
+              'WEBP': 'image/webp'}
+
+Variant = namedtuple('Variant', 'width height format geometry options')
+
+
+class Engine(pil_engine.Engine):
+    """PIL-движок sorl для Pillow 10, где убрали Image.ANTIALIAS."""
+
+    def _scale(self, image, width, height):
+        return image.resize((width, height), resample=Image.LANCZOS)
+
+
+class KVStore(cached_db_kvstore.KVStore):
+    """KV-хранилище sorl, которое помнит промахи недолго.
+
+    Миниатюры делает воркер в другом процессе: промах, закэшированный
+    на THUMBNAIL_CACHE_TIMEOUT, навсегда оставил бы на страницах
+    оригинал, даже когда миниатюра давно готова.
+    """
+
+    def _get_raw(self, key):
+        value = self.cache.get(key)
+        if value is None:
+            try:
+                value = KVStoreModel.objects.get(key=key).value
+                timeout = sorl_settings.THUMBNAIL_CACHE_TIMEOUT
+            except KVStoreModel.DoesNotExist:
+                value = cached_db_kvstore.EMPTY_VALUE
+                timeout = settings.THUMBNAIL_MISS_TIMEOUT
+            self.cache.set(key, value, timeout)
+        if value == cached_db_kvstore.EMPTY_VALUE:
+            return None
+        return value
+
+
+def preset(name):
+    geometry, options = settings.POST_THUMBNAILS[name]
+    return geometry, dict(options)
+
+
+def variants(preset_name):
+    """Варианты пресета: каждая ширина из POST_THUMBNAIL_WIDTHS, не больше
+    ширины пресета, в форматах из POST_THUMBNAIL_FORMATS и в формате
+    оригинала (format None).
+
+    Пропорции у всех вариантов как у пресета. Последний вариант — сам
+    пресет в формате оригинала.
+    """
+    geometry, options = preset(preset_name)
+    width, height = map(int, geometry.split('x'))
+    widths = {size for size in settings.POST_THUMBNAIL_WIDTHS if size < width}
+    result = []
+    for size in sorted(widths | {width}):
+        size_height = round(height * size / width)
+        for image_format in (*settings.POST_THUMBNAIL_FORMATS, None):
+            size_options = dict(options)
+            if image_format:
+                size_options['format'] = image_format
+            result.append(Variant(
+                size, size_height, image_format,
+                f'{size}x{size_height}', size_options
+            ))
+    return result
+
+
+def generate(source):
+    """Создаёт все варианты пресетов POST_THUMBNAILS для файла source.
+
+    Посты с этой картинкой затем пересохраняются: страницы, которые
+    успели закэшироваться с оригиналом, сбрасывают их сигналы.
+    """
+    for preset_name in settings.POST_THUMBNAILS:
+        for variant in variants(preset_name):
+            get_thumbnail(
+                source_file(source), variant.geometry, **variant.options
+            )
+    for post in Post.objects.filter(image=source):
+        post.save(update_fields=['updated_at'])
+
+
+def schedule(image):
+    """Ставит генерацию в очередь, если миниатюр картинки ещё нет.
+
+    Повторная загрузка того же файла получает то же имя в хранилище,
+    и готовые миниатюры просто переиспользуются.
+    """
+    if image and not all(
+            lookup(image, name) for name in settings.POST_THUMBNAILS):
+        enqueue(
+            GENERATE_JOB, key=f'thumbnails:{image.name}', source=image.name
+        )
+
+
+def source_file(name):
+    """Картинка поста для sorl — в хранилище поля Post.image.
+
+    Хранилище входит в ключ KV-хранилища sorl, поэтому и воркер,
+    и шаблоны должны видеть исходник с одним и тем же хранилищем.
+    """
+    return ImageFile(name, Post._meta.get_field('image').storage)
+
+
+def thumbnail_name(source, geometry, options):
+    """Имя файла миниатюры — так же, как его вычисляет sorl."""
+    backend = default.backend
+    options = dict(options)
+    if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+        options.setdefault('format', backend._get_format(source))
+    for key, value in backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in backend.extra_options:
+        value = getattr(sorl_settings, attr)
+        if value != getattr(default_settings, attr):
+            options.setdefault(key, value)
+    return backend._get_thumbnail_filename(source, geometry, options)
+
+
+def variant_file(image, variant):
+    """ImageFile варианта: по нему sorl ищет миниатюру в KV-хранилище."""
+    name = thumbnail_name(ImageFile(image), variant.geometry, variant.options)
+    return ImageFile(name, default.storage)
+
+
+def lookup_variant(image, variant):
+    """Готовый вариант из KV-хранилища sorl или None.
+
+    В отличие от get_thumbnail не открывает исходную картинку и ничего
+    не генерирует.
+    """
+    if not image:
+        return None
+    return default.kvstore.get(variant_file(image, variant))
+
+
+def lookup(image, preset_name):
+    """Миниатюра пресета в формате оригинала или None."""
+    return lookup_variant(image, variants(preset_name)[-1])
+
+
+def lookup_many(files):
+    """Готовые миниатюры для списка ImageFile: {key: ImageFile или None}.
+
+    Для cached_db-хранилища sorl — один cache.get_many и один запрос
+    к базе на все ключи, которых нет в кэше; промахи кэшируются
+    на THUMBNAIL_MISS_TIMEOUT, как в KVStore. Другие хранилища
+    опрашиваются по ключу.
+    """
+    kvstore = default.kvstore
+    if not isinstance(kvstore, cached_db_kvstore.KVStore):
+        return {file.key: kvstore.get(file) for file in files}
+
+    raw_keys = {add_prefix(file.key): file.key for file in files}
+    values = kvstore.cache.get_many(list(raw_keys))
+    missing = [key for key in raw_keys if key not in values]
+    if missing:
+        loaded = dict(KVStoreModel.objects.filter(
+            key__in=missing
+        ).values_list('key', 'value'))
+        empty = dict.fromkeys(
+            set(missing) - set(loaded), cached_db_kvstore.EMPTY_VALUE
+        )
+        if loaded:
+            kvstore.cache.set_many(
+                loaded, sorl_settings.THUMBNAIL_CACHE_TIMEOUT
+            )
+        if empty:
+            kvstore.cache.set_many(empty, settings.THUMBNAIL_MISS_TIMEOUT)
+        values.update(loaded)
+        values.update(empty)
+    return {
+        key: None if values[raw_key] == cached_db_kvstore.EMPTY_VALUE
+        else deserialize_image_file(values[raw_key])
+        for raw_key, key in raw_keys.items()
+    }
+
+
+def build_picture(image, preset_name, found):
+    """Данные для <picture>: srcset по форматам и запасной <img>.
+
+    found — готовые миниатюры по порядку variants(preset_name), None
+    для ещё не сделанных. Пока нет самого большого варианта, src —
+    оригинал картинки.
+    """
+    geometry, _ = preset(preset_name)
+    width, height = map(int, geometry.split('x'))
+    sources = {}
+    if found[-1] is not None:
+        for variant, thumbnail in zip(variants(preset_name), found):
+            if thumbnail is not None:
+                sources.setdefault(variant.format, []).append(
+                    f'{thumbnail.url} {variant.width}w'
+                )
+    fallback = sources.pop(None, None)
+    return {
+        'sources': [
+            {'type': MIME_TYPES[image_format], 'srcset': ', '.join(srcset)}
+            for image_format, srcset in sources.items()
+        ],
+        'srcset': ', '.join(fallback or ()),
+        'src': fallback[-1].rsplit(' ', 1)[0] if fallback else image.url,
+        'pending': not fallback,
+        'width': width,
+        'height': height,
+    }
+
+
+def picture(image, preset_name):
+    """build_picture для одной картинки."""
+    files = [variant_file(image, variant) for variant in variants(preset_name)]
+    found = lookup_many(files)
+    return build_picture(
+        image, preset_name, [found[file.key] for file in files]
+    )
+
+
+def prefetch_pictures(posts):
+    """Заполняет post.pictures[пресет] для всех постов страницы сразу.
+
+    Все варианты всех картинок ищутся одним lookup_many, поэтому
+    страница ленты стоит постоянное число обращений к кэшу и базе,
+    сколько бы на ней ни было картинок.
+    """
+    posts = [post for post in posts if post.image]
+    files = {
+        (post.pk, preset_name): [
+            variant_file(post.image, variant)
+            for variant in variants(preset_name)
+        ]
+        for post in posts
+        for preset_name in settings.POST_THUMBNAILS
+    }
+    found = lookup_many([file for group in files.values() for file in group])
+    for post in posts:
+        post.pictures = {
+            preset_name: build_picture(
+                post.image, preset_name,
+                [found[file.key] for file in files[post.pk, preset_name]]
+            )
+            for preset_name in settings.POST_THUMBNAILS
+        }
+    return posts
+
+
+def savings():
+    """Отчёт о размерах вариантов в байтах в сравнении с оригиналами.
+
+    Для каждого варианта суммируются только картинки, у которых он уже
+    есть, поэтому ratio — доля от веса тех же оригиналов.
+    """
+    report = {}
+    images = 0
+    original_total = 0
+    names = Post.objects.exclude(image='').values_list('image', flat=True)
+    for name in names.iterator():
+        image = source_file(name)
+        if not image.exists():
+            continue
+        images += 1
+        original = image.storage.size(name)
+        original_total += original
+        for preset_name in settings.POST_THUMBNAILS:
+            for variant in variants(preset_name):
+                key = (
+                    f'{preset_name} {variant.width}w '
+                    f'{(variant.format or "original").lower()}'
+                )
+                row = report.setdefault(key, {
+                    'images': 0, 'bytes': 0, 'original_bytes': 0
+                })
+                thumbnail = lookup_variant(image, variant)
+                if thumbnail is None:
+                    continue
+                row['images'] += 1
+                row['bytes'] += default.storage.size(thumbnail.name)
+                row['original_bytes'] += original
+    for row in report.values():
+        row['ratio'] = round(
+            row['bytes'] / row['original_bytes'], 3
+        ) if row['original_bytes'] else None
+    return {
+        'images': images,
+        'original_bytes': original_total,
+        'variants': report,
+    }
@@ -0,0 +1,153 @@
+import hashlib
+import tempfile
+from functools import wraps
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadhandler import (
+    SkipFile, TemporaryFileUploadHandler
+)
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from PIL import Image, ImageOps
+
+# Столько байт от начала файла копится, чтобы прочитать заголовок.
+# У JPEG размеры лежат после EXIF, который бывает в десятки килобайт.
+HEADER_BYTES: int = 256 * 1024
+ORIENTATION_TAG: int = 0x0112
+JPEG_QUALITY: int = 90
+COPY_CHUNK: int = 64 * 1024
+
+
+def check_header(file):
+    """Проверяет формат и размеры картинки по одному заголовку.
+
+    Image.open пикселей не декодирует, поэтому проверка дешёвая
+    и подходит и для начала файла, пока он ещё загружается.
+    """
+    too_large = ValidationError(
+        'Картинка больше %(limit)s Мп.', code='image_pixels',
+        params={'limit': settings.POST_IMAGE_MAX_PIXELS // 10 ** 6}
+    )
+    try:
+        image = Image.open(file)
+    except Image.DecompressionBombError:
+        raise too_large
+    if image.format not in settings.POST_IMAGE_FORMATS:
+        raise ValidationError(
+            'Формат %(format)s не поддерживается.',
+            code='image_format', params={'format': image.format}
+        )
+    width, height = image.size
+    if width * height > settings.POST_IMAGE_MAX_PIXELS:
+        raise too_large
+    return image
+
+
+class ImageUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загрузку во временный файл по частям и обрывает её сразу,
+    как только она превысила лимит байт или заголовок не прошёл
+    check_header.
+
+    Отклонённый файл пропускается (SkipFile), остальные поля формы
+    доходят до view, а причина сохраняется в request.upload_errors.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.head = b''
+        self.checked = False
+        self.hasher = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.POST_IMAGE_MAX_BYTES:
+            self.reject(ValidationError(
+                'Файл больше %(limit)s МБ.', code='image_bytes',
+                params={'limit': settings.POST_IMAGE_MAX_BYTES // 2 ** 20}
+            ))
+        if not self.checked:
+            self.head = (self.head + raw_data)[:HEADER_BYTES]
+            try:
+                check_header(BytesIO(self.head))
+            except ValidationError as error:
+                self.reject(error)
+            except Exception:
+                if len(self.head) >= HEADER_BYTES:
+                    self.reject(ValidationError(
+                        'Файл не похож на картинку.', code='invalid_image'
+                    ))
+            else:
+                self.checked = True
+                self.head = b''
+        self.hasher.update(raw_data)
+        super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        # Хэш для ContentAddressedStorage считается по ходу приёма,
+        # второй раз файл ради него не читается.
+        file = super().file_complete(file_size)
+        file.sha256 = self.hasher.hexdigest()
+        return file
+
+    def reject(self, error):
+        if not hasattr(self.request, 'upload_errors'):
+            self.request.upload_errors = {}
+        self.request.upload_errors[self.field_name] = error
+        raise SkipFile()
+
+
+def image_uploads(view):
+    """Загрузки view принимает ImageUploadHandler.
+
+    Обработчики нельзя менять после чтения request.POST, а его читает
+    CsrfViewMiddleware, поэтому CSRF проверяется уже внутри.
+    """
+    protected = csrf_protect(view)
+
+    @csrf_exempt
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request.upload_handlers = [ImageUploadHandler(request)]
+        return protected(request, *args, **kwargs)
+    return wrapper
+
+
+def sanitize(upload):
+    """Убирает EXIF и поворачивает картинку по тегу ориентации.
+
+    Файлы без EXIF возвращаются как есть. Иначе картинка декодируется
+    один раз — объём памяти ограничен POST_IMAGE_MAX_PIXELS — и
+    пересохраняется без метаданных, кроме ICC; sha256 пересчитывается.
+    """
+    upload.seek(0)
+    image = Image.open(upload)
+    exif = image.getexif()
+    if image.format == 'GIF' or not exif:
+        upload.seek(0)
+        return upload
+
+    image_format = image.format
+    options = {'icc_profile': image.info.get('icc_profile')}
+    if exif.get(ORIENTATION_TAG, 1) != 1:
+        image = ImageOps.exif_transpose(image)
+        if image_format == 'JPEG':
+            options['quality'] = JPEG_QUALITY
+    elif image_format == 'JPEG':
+        # Без поворота JPEG пережимается с исходными таблицами квантования.
+        options['quality'] = 'keep'
+
+    # Пишется в тот же файл загрузки, чтобы его по-прежнему закрывал
+    # и удалял сам Django.
+    with tempfile.TemporaryFile() as clean:
+        image.save(clean, format=image_format, **options)
+        clean.seek(0)
+        upload.seek(0)
+        upload.truncate()
+        hasher = hashlib.sha256()
+        for chunk in iter(lambda: clean.read(COPY_CHUNK), b''):
+            hasher.update(chunk)
+            upload.write(chunk)
+    upload.sha256 = hasher.hexdigest()
+    upload.size = upload.tell()
+    upload.seek(0)
+    return upload
@@ -1,41 +1,70 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.views.decorators.http import condition
+from . import thumbnails
 from .models import Post, Group, User, Follow
 from .forms import PostForm, CommentForm
+from .caching import feed_version, posts_generation
+from .conditional import (
+    feed_etag, post_detail_etag, post_etag, post_last_modified, profile_etag
+)
+from .feeds import get_follow_page, pulled_authors
+from .page_cache import cache_anonymous_page, post_tags, tag_response
+from .paginators import COMMENT_KEYS, CursorPaginator, get_page_obj
+from .search import build_query, search as search_posts
+from .uploads import image_uploads
 
 POSTS_QUANTITY: int = 10
+COMMENTS_QUANTITY: int = 20
+PAGE_CACHE_TIMEOUT: int = 60 * 60
 
 
+@cache_anonymous_page(PAGE_CACHE_TIMEOUT)
+@condition(etag_func=feed_etag)
 def index(request):
     template = 'posts/index.html'
-    posts = Post.objects.select_related('author', 'group')
-    paginator = Paginator(posts, POSTS_QUANTITY)
-    page_obj = paginator.get_page(request.GET.get('page'))
+    # Поколение читается до постов: запись между ними сбросит его,
+    # и фрагмент со старыми постами не попадёт под новое поколение.
+    generation = posts_generation()
+    posts = Post.objects.feed()
+    page_obj = get_page_obj(request, posts, POSTS_QUANTITY)
     context = {
-        'page_obj': page_obj
+        'page_obj': page_obj,
+        'posts_generation': generation
     }
-    return render(request, template, context)
+    return tag_response(
+        render(request, template, context), ['index'], page_obj
+    )
 
 
+@cache_anonymous_page(PAGE_CACHE_TIMEOUT)
+@condition(etag_func=feed_etag)
 def group_posts(request, slug):
     template = 'posts/group_list.html'
+    generation = posts_generation()
     group = get_object_or_404(Group, slug=slug)
-    paginator = Paginator(group.posts.all(), POSTS_QUANTITY)
-    page_obj = paginator.get_page(request.GET.get('page'))
+    posts = group.posts.feed()
+    page_obj = get_page_obj(request, posts, POSTS_QUANTITY)
     context = {
         'group': group,
-        'page_obj': page_obj
+        'page_obj': page_obj,
+        'posts_generation': generation
     }
-    return render(request, template, context)
+    return tag_response(
+        render(request, template, context), [f'group:{group.pk}'], page_obj
+    )
 
 
+@cache_anonymous_page(PAGE_CACHE_TIMEOUT)
+@condition(etag_func=profile_etag)
 def profile(request, username):
     template = 'posts/profile.html'
-    user = get_object_or_404(User, username=username)
-    posts = user.posts.select_related('author', 'group')
-    paginator = Paginator(posts, POSTS_QUANTITY)
-    page_obj = paginator.get_page(request.GET.get('page'))
+    generation = posts_generation()
+    user = get_object_or_404(
+        User.objects.select_related('profile'), username=username
+    )
+    posts = user.posts.feed()
+    page_obj = get_page_obj(request, posts, POSTS_QUANTITY)
 
     following = not request.user.is_anonymous and Follow.objects.filter(
         user=request.user, author=user)
@@ -43,21 +72,76 @@ def profile(request, username):
     context = {
         'author': user,
         'page_obj': page_obj,
-        'following': following
+        'following': following,
+        'posts_generation': generation
     }
-    return render(request, template, context)
+    return tag_response(
+        render(request, template, context), [f'author:{user.pk}'], page_obj
+    )
 
 
+@cache_anonymous_page(PAGE_CACHE_TIMEOUT)
+@condition(etag_func=post_detail_etag)
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, pk=post_id)
-    comments = post.comments.select_related('author')
+    post = get_object_or_404(
+        Post.objects.select_related('author__profile', 'group'), pk=post_id
+    )
+    comments = get_comments_page(request, post)
     context = {
         'post': post,
         'form': CommentForm(),
         'comments': comments
     }
-    return render(request, template, context)
+    tags = post_tags(post) | {
+        f'author:{comment.author_id}' for comment in comments
+    }
+    return tag_response(render(request, template, context), tags)
+
+
+def get_comments_page(request, post):
+    return CursorPaginator(
+        post.comments.select_related('author'),
+        COMMENTS_QUANTITY,
+        COMMENT_KEYS
+    ).get_page(request.GET.get('cursor'))
+
+
+@cache_anonymous_page(PAGE_CACHE_TIMEOUT)
+@condition(etag_func=post_etag, last_modified_func=post_last_modified)
+def post_comments(request, post_id):
+    template = 'includes/comments_list.html'
+    post = get_object_or_404(Post.objects.only('pk'), pk=post_id)
+    comments = get_comments_page(request, post)
+    context = {
+        'post': post,
+        'comments': comments
+    }
+    tags = {f'post:{post.pk}'} | {
+        f'author:{comment.author_id}' for comment in comments
+    }
+    return tag_response(render(request, template, context), tags)
+
+
+@cache_anonymous_page(PAGE_CACHE_TIMEOUT)
+@condition(etag_func=feed_etag)
+def search(request):
+    template = 'posts/search.html'
+    query = request.GET.get('q', '').strip()
+    page_obj = None
+    # Запрос без единого слова искать нечем: FTS5 не принимает
+    # пустой MATCH.
+    if build_query(query):
+        page_obj = search_posts(
+            query, request.GET.get('cursor'), POSTS_QUANTITY
+        )
+    context = {
+        'query': query,
+        'page_obj': page_obj
+    }
+    return tag_response(
+        render(request, template, context), ['index'], page_obj or ()
+    )
 
 
 @login_required
@@ -73,29 +157,34 @@ def add_comment(request, post_id):
 
 
 @login_required
+@image_uploads
 def post_create(request):
     template = 'posts/create_post.html'
     form = PostForm(
         request.POST or None,
-        files=request.FILES or None
+        files=request.FILES or None,
+        upload_errors=getattr(request, 'upload_errors', None)
     )
 
     if form.is_valid():
-        form = form.save(commit=False)
-        form.author = request.user
-        form.save()
+        post = form.save(commit=False)
+        post.author = request.user
+        post.save()
+        thumbnails.schedule(post.image)
         return redirect('posts:profile', request.user.username)
     return render(request, template, {'form': form})
 
 
 @login_required
+@image_uploads
 def post_edit(request, post_id):
     template = 'posts/create_post.html'
     post = get_object_or_404(Post, pk=post_id)
     form = PostForm(
         request.POST or None,
         files=request.FILES or None,
-        instance=post
+        instance=post,
+        upload_errors=getattr(request, 'upload_errors', None)
     )
 
     if request.user != post.author:
@@ -103,6 +192,8 @@ def post_edit(request, post_id):
 
     if form.is_valid():
         form.save()
+        if 'image' in form.changed_data:
+            thumbnails.schedule(post.image)
         return redirect('posts:post_detail', post_id)
 
     context = {
@@ -115,26 +206,26 @@ def post_edit(request, post_id):
 
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(
-        author__following__user=request.user
-    ).all()
-    paginator = Paginator(posts, POSTS_QUANTITY)
-    page_obj = paginator.get_page(request.GET.get('page'))
+    pulled = pulled_authors(request.user)
+    # Версия читается до ленты, как posts_generation в index.
+    version = feed_version(request.user.pk, pulled)
+    page_obj = get_follow_page(request, POSTS_QUANTITY, pulled)
 
     return render(
         request,
         'posts/follow.html',
-        context={'page_obj': page_obj}
+        context={
+            'page_obj': page_obj,
+            'feed_version': version
+        }
     )
 
 
 @login_required
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
-    if not (author == request.user or request.user.follower.filter(
-            author=author
-    ).exists()):
-        Follow.objects.create(
+    if author != request.user:
+        Follow.objects.get_or_create(
             user=request.user,
             author=author
         )
@@ -143,7 +234,9 @@ def profile_follow(request, username):
 
 @login_required
 def profile_unfollow(request, username):
-    user = get_object_or_404(User, username=username)
+    user = get_object_or_404(
+        User.objects.select_related('profile'), username=username
+    )
     follow_link = request.user.follower.filter(author=user)
     if follow_link:
         follow_link.delete()
@@ -0,0 +1,15 @@
+'use strict';
+(function($) {
+    // Переход на отфильтрованный список при выборе в автокомплите.
+    $(document).on('change', 'select[data-filter-parameter]', function() {
+        var params = new URLSearchParams(window.location.search);
+        var name = this.getAttribute('data-filter-parameter');
+        if (this.value) {
+            params.set(name, this.value);
+        } else {
+            params.delete(name);
+        }
+        params.delete('p');
+        window.location.search = params.toString();
+    });
+})(django.jQuery);
@@ -0,0 +1,68 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:08
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def related_count(model, field):
+    rows = model.objects.filter(**{field: OuterRef('pk')}).order_by()
+    return Coalesce(
+        Subquery(
+            rows.values(field).annotate(total=Count('pk')).values('total'),
+            output_field=models.IntegerField()
+        ),
+        0
+    )
+
+
+def create_profiles(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Post = apps.get_model('posts', 'Post')
+    Follow = apps.get_model('posts', 'Follow')
+    Profile = apps.get_model('users', 'Profile')
+    users = User.objects.annotate(
+        posts_total=related_count(Post, 'author'),
+        followers_total=related_count(Follow, 'author'),
+        following_total=related_count(Follow, 'user'),
+    ).values_list(
+        'pk', 'posts_total', 'followers_total', 'following_total'
+    )
+    Profile.objects.bulk_create(
+        [
+            Profile(
+                user_id=pk,
+                posts_count=posts,
+                followers_count=followers,
+                following_count=following
+            )
+            for pk, posts, followers, following in users.iterator()
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0007_follow'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Profile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='постов')),
+                ('followers_count', models.PositiveIntegerField(default=0, verbose_name='подписчиков')),
+                ('following_count', models.PositiveIntegerField(default=0, verbose_name='подписок')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='profile', to=settings.AUTH_USER_MODEL, verbose_name='пользователь')),
+            ],
+        ),
+        migrations.RunPython(create_profiles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def mark_pulled(apps, schema_editor):
+    Profile = apps.get_model('users', 'Profile')
+    Profile.objects.filter(
+        followers_count__gte=settings.FEED_PULL_THRESHOLD
+    ).update(feed_pulled=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='feed_pulled',
+            field=models.BooleanField(default=False, verbose_name='посты подтягиваются в ленты'),
+        ),
+        migrations.RunPython(mark_pulled, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+User = get_user_model()
+
+
+class Profile(models.Model):
+    user = models.OneToOneField(
+        to=User,
+        on_delete=models.CASCADE,
+        related_name='profile',
+        verbose_name='пользователь'
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='постов'
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='подписчиков'
+    )
+    following_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='подписок'
+    )
+    feed_pulled = models.BooleanField(
+        default=False,
+        verbose_name='посты подтягиваются в ленты'
+    )
+
+    def __str__(self):
+        return str(self.user)
@@ -1,4 +1,5 @@
 import os
+import sys
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -38,6 +39,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.QueryStatsMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -58,7 +61,7 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backends.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -83,14 +86,70 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Соединение живёт между запросами: PRAGMA и кэш страниц SQLite
+        # не приходится заводить заново на каждый запрос.
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# Реплика для чтения лент (core.routers) — файл SQLite, который
+# обновляет команда refresh_replica. Включается переменной окружения
+# с путём к файлу; в тестах реплика — та же база, что и default.
+READ_REPLICA = None
+if os.environ.get('YATUBE_REPLICA'):
+    READ_REPLICA = 'replica'
+    DATABASES[READ_REPLICA] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['YATUBE_REPLICA'],
+        'CONN_MAX_AGE': 60,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.routers.ReadReplicaRouter']
+
+# Приложения, которые читаются с реплики; сессии, очередь задач
+# и миниатюры sorl всегда на основной базе.
+REPLICA_APPS = ('posts', 'users', 'auth')
+REPLICA_VIEWS = (
+    'posts:index',
+    'posts:group_list',
+    'posts:profile',
+    'posts:post_detail',
+    'posts:post_comments',
+    'posts:follow_index',
+    'posts:search',
+)
+# После записи пользователь столько секунд читает с основной базы.
+# Должно быть больше интервала refresh_replica --interval.
+REPLICA_STICKY_SECONDS = 10
+
+# Выполняются на каждом новом соединении с SQLite (core.db). WAL
+# пускает читателей параллельно с писателем, NORMAL в WAL не теряет
+# согласованность и не делает fsync на каждый коммит, busy_timeout
+# ждёт блокировку вместо «database is locked».
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Кэш должен быть общим для всех процессов: сбросы версий страниц
+# и записи о миниатюрах из run_jobs иначе не дойдут до веб-сервера.
+# LocMemCache годится только для тестов и runserver без воркера;
+# YATUBE_CACHE_DIR включает файловый кэш в этом каталоге.
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
+if os.environ.get('YATUBE_CACHE_DIR'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ['YATUBE_CACHE_DIR'],
+    }
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -131,4 +190,60 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 STATIC_URL = '/static/'
+# collectstatic добавляет в имена хэш содержимого и кладёт рядом
+# .gz/.br копии; отдаёт их core.staticfiles.serve.
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+STATICFILES_STORAGE = 'core.staticfiles.CompressedManifestStaticFilesStorage'
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+# Функции, которые выполняет воркер фоновых задач (core.jobs).
+JOB_FUNCTIONS = (
+    'posts.thumbnails.generate',
+    'posts.feeds.resume_push',
+)
+
+# Миниатюры картинок постов: пресет -> (геометрия, опции sorl).
+# Все пресеты генерирует фоновый воркер (manage.py run_jobs) сразу
+# после загрузки, шаблоны только читают готовые.
+POST_THUMBNAILS = {
+    'card': ('960x339', {'crop': 'center', 'upscale': True}),
+}
+# Ширины вариантов для srcset и форматы, в которые они дополнительно
+# перекодируются; формат оригинала создаётся всегда.
+POST_THUMBNAIL_WIDTHS = (320, 640, 960)
+POST_THUMBNAIL_FORMATS = ('WEBP',)
+THUMBNAIL_ENGINE = 'posts.thumbnails.Engine'
+THUMBNAIL_KVSTORE = 'posts.thumbnails.KVStore'
+# Столько секунд помнится, что миниатюры ещё нет.
+THUMBNAIL_MISS_TIMEOUT = 30
+
+# Ограничения на картинки постов. Проверяются по мере приёма файла:
+# загрузка обрывается, как только превышен размер или по заголовку
+# видно, что формат или число пикселей не подходят.
+POST_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+POST_IMAGE_MAX_PIXELS = 24 * 10 ** 6
+POST_IMAGE_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+
+# Авторы, у которых подписчиков не меньше порога, не раскладываются
+# по лентам при публикации, а подмешиваются в ленту при чтении.
+FEED_PULL_THRESHOLD = 5000
+# Обратно к раскладыванию автор переходит, только опустившись ниже
+# этой доли порога: у самой границы подписки не гоняют его туда-сюда.
+FEED_RESUME_RATIO = 0.9
+
+# Бюджеты страниц по имени URL: число запросов и время SQL в мс.
+# При превышении пишется предупреждение, а в тестах — ошибка: под
+# manage.py test здесь, под pytest — фикстурой из conftest.py.
+QUERY_STATS_APPS = ('posts', 'users', 'about')
+QUERY_BUDGETS = {
+    'posts:index': {'queries': 4},
+    'posts:group_list': {'queries': 5},
+    'posts:profile': {'queries': 6},
+    'posts:post_detail': {'queries': 6},
+    'posts:post_comments': {'queries': 5},
+    'posts:follow_index': {'queries': 6},
+    'posts:search': {'queries': 4},
+    'about:author': {'queries': 2},
+    'about:tech': {'queries': 2},
+}
+QUERY_BUDGET_STRICT = sys.argv[1:2] == ['test']
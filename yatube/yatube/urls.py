@@ -1,13 +1,18 @@
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
+from core import staticfiles
 
 urlpatterns = [
     path('about/', include('about.urls', namespace='about')),
     path('auth/', include('users.urls', namespace='users')),
     path('auth/', include('django.contrib.auth.urls')),
     path('admin/', admin.site.urls),
+    re_path(
+        r'^{}(?P<path>.+)$'.format(settings.STATIC_URL.lstrip('/')),
+        staticfiles.serve
+    ),
     path('', include('posts.urls', namespace='posts'))
 ]
 